@@ -0,0 +1,62 @@
+"""Сравнение движков извлечения статуса PEP: страниц в секунду.
+
+    python benchmarks/bench_extract.py [--pages 300] [--corpus DIR]
+
+Без --corpus используется синтетический корпус из corpus.py. Результат
+печатается в формате JSON.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from benchlib import print_report
+import corpus
+from constants import ENGINE_BS4, ENGINE_LXML
+from extractors import extract_pep_status
+
+
+def load_corpus(corpus_dir, pages):
+    if corpus_dir is not None:
+        paths = sorted(Path(corpus_dir).glob('*/pep-*/index.html'))[:pages]
+        return [path.read_bytes() for path in paths]
+    return [
+        corpus.pep_page(number, status).encode('utf-8')
+        for number, _, _, status in corpus.make_peps(pages)
+    ]
+
+
+def run_engine(engine, contents, repeat):
+    best = None
+    statuses = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        statuses = [extract_pep_status(content, engine)
+                    for content in contents]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--corpus', help='Каталог корпуса (см. record.py)')
+    args = parser.parse_args()
+    contents = load_corpus(args.corpus, args.pages)
+    report = {'pages': len(contents), 'engines': {}}
+    reference = None
+    for engine in (ENGINE_BS4, ENGINE_LXML):
+        elapsed, statuses = run_engine(engine, contents, args.repeat)
+        if reference is None:
+            reference = statuses
+        report['engines'][engine] = {
+            'seconds': round(elapsed, 4),
+            'pages_per_second': round(len(contents) / elapsed, 1),
+            'matches_bs4': statuses == reference,
+        }
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Чтение страниц из тёплого SQLite-кеша и из архива снимка.
+
+    python benchmarks/bench_replay.py [--pages 700] [--repeat 3]
+
+Страницы PEP из синтетического корпуса один раз загружаются с локального
+сервера, при этом попадают и в кеш, и в архив снимка. Затем замеряется
+чтение всех страниц через utils.get_response каждым способом. Результат
+печатается в формате JSON.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchlib import print_report
+import corpus
+from server import CorpusServer, RewriteAdapter
+
+PEP_URL = 'https://{host}/pep-{number:04d}/'
+
+
+def read_all(session, urls, repeat):
+    from utils import get_response
+    best = None
+    contents = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        contents = [get_response(session, url).content for url in urls]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=700)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import configs
+    from replay import snapshot_session
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        corpus_dir = workdir / 'corpus'
+        urls = []
+        for number, _, _, status in corpus.make_peps(args.pages):
+            corpus.write_page(corpus_dir, corpus.PEPS_HOST,
+                              f'pep-{number:04d}/',
+                              corpus.pep_page(number, status))
+            urls.append(PEP_URL.format(host=corpus.PEPS_HOST, number=number))
+        server = CorpusServer(corpus_dir).start()
+        session = configs.configure_session(cache_name=workdir / 'cache')
+        try:
+            RewriteAdapter(server.base_url).mount(session)
+            archive = workdir / 'pages.snapshot'
+            with snapshot_session(session, write_path=archive):
+                read_all(session, urls, 1)
+            cache_seconds, cached = read_all(session, urls, args.repeat)
+            replay_session = configs.configure_session(backend='memory')
+            with snapshot_session(replay_session, read_path=archive):
+                replay_seconds, replayed = read_all(
+                    replay_session, urls, args.repeat)
+        finally:
+            session.close()
+            server.shutdown()
+        report = {'pages': len(urls), 'archive_bytes': archive.stat().st_size}
+    for name, seconds in (('sqlite_cache', cache_seconds),
+                          ('snapshot', replay_seconds)):
+        report[name] = {
+            'seconds': round(seconds, 4),
+            'pages_per_second': round(len(urls) / seconds, 1),
+        }
+    report['identical'] = cached == replayed
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
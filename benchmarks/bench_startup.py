@@ -0,0 +1,80 @@
+"""Время запуска CLI: python -X importtime src/main.py -h.
+
+    python benchmarks/bench_startup.py [--runs 10] [--budget-ms 100]
+
+Считает медиану времени импортов самого парсера (без модулей, которые
+интерпретатор загружает при любом запуске) и полного времени процесса.
+Завершается с кодом 1, если импорты превысили бюджет или при разборе
+аргументов загрузилась тяжёлая зависимость.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchlib import SRC_DIR, print_report
+
+HEAVY_MODULES = (
+    'bs4', 'lxml', 'prettytable', 'requests', 'requests_cache', 'tqdm',
+    'urllib3',
+)
+
+
+def import_times(command):
+    """Возвращает {модуль верхнего уровня: накопленное время в мкс}."""
+    completed = subprocess.run(
+        (sys.executable, '-X', 'importtime', *command),
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+
+def top_level(times):
+    return {
+        name: cumulative for name, cumulative in times.items()
+        if not name.startswith('  ')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    args = parser.parse_args()
+    baseline = {name.strip() for name in import_times(('-c', 'pass'))}
+    command = (str(SRC_DIR / 'main.py'), '-h')
+    import_ms = []
+    wall_ms = []
+    loaded = set()
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        times = import_times(command)
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        own = {
+            name.strip(): cumulative
+            for name, cumulative in top_level(times).items()
+            if name.strip() not in baseline
+        }
+        import_ms.append(sum(own.values()) / 1000)
+        loaded |= {name.strip().split('.')[0] for name in times}
+    heavy = sorted(loaded & set(HEAVY_MODULES))
+    report = {
+        'import_ms_median': round(statistics.median(import_ms), 2),
+        'wall_ms_median': round(statistics.median(wall_ms), 2),
+        'budget_ms': args.budget_ms,
+        'heavy_modules': heavy,
+    }
+    print_report(report)
+    if heavy or report['import_ms_median'] > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
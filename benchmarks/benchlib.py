@@ -0,0 +1,18 @@
+"""Общие помощники бенчмарков.
+
+Импорт модуля добавляет каталог src в sys.path, поэтому он должен идти
+раньше импортов модулей парсера.
+"""
+import json
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
+
+
+def print_report(report):
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,238 @@
+"""Синтетический корпус страниц, повторяющий разметку docs/peps.python.org.
+
+Используется бенчмарками, когда нет записанного снимка настоящих страниц.
+"""
+import io
+import random
+import tarfile
+import zipfile
+
+PEP_STATUSES = (
+    ('A', 'Active'), ('A', 'Accepted'), ('D', 'Deferred'), ('F', 'Final'),
+    ('P', 'Provisional'), ('R', 'Rejected'), ('S', 'Superseded'),
+    ('W', 'Withdrawn'), ('', 'Draft'),
+)
+PEP_TYPES = ('I', 'P', 'S')
+
+PEP_PAGE = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>PEP {number} – Synthetic page | peps.python.org</title></head>
+<body><header><nav><ul>{nav}</ul></nav></header>
+<section id="pep-page-section"><article>
+<section id="pep-content"><h1 class="page-title">PEP {number} – Synthetic</h1>
+<dl class="rfc2822 field-list simple">
+<dt class="field-odd">Author<span class="colon">:</span></dt>
+<dd class="field-odd">Author {number} &lt;author@example.org&gt;</dd>
+<dt class="field-even">Status<span class="colon">:</span></dt>
+<dd class="field-even"><abbr title="{status}">{status}</abbr></dd>
+<dt class="field-odd">Type<span class="colon">:</span></dt>
+<dd class="field-odd">Standards Track</dd>
+<dt class="field-even">Created<span class="colon">:</span></dt>
+<dd class="field-even">01-Jan-2000</dd>
+</dl>
+{body}
+</section></article>
+<nav id="pep-sidebar"><ul>{nav}</ul></nav></section>
+<footer>Copyright</footer></body></html>
+'''
+PEP_SECTION = (
+    '<section id="s{index}"><h2>Section {index}</h2>'
+    '<p>{text}</p><pre>{code}</pre></section>'
+)
+PEP_INDEX_ROW = (
+    '<tr class="row-{parity}"><td><abbr>{type}{letter}</abbr></td>'
+    '<td><a class="pep reference internal" href="pep-{number:04d}/">'
+    '{number}</a></td><td><a href="pep-{number:04d}/">Synthetic PEP'
+    '</a></td><td>Author</td></tr>'
+)
+PEP_INDEX = '''<!DOCTYPE html><html><body>
+<section id="numerical-index"><h2>Numerical Index</h2>
+<table class="pep-zero-table docutils align-default"><thead><tr>
+<th>Type</th><th>PEP</th><th>Title</th><th>Authors</th></tr></thead>
+<tbody>{rows}</tbody></table></section></body></html>
+'''
+WORDS = (
+    'python', 'interpreter', 'syntax', 'module', 'import', 'function',
+    'generator', 'coroutine', 'typing', 'annotation', 'proposal', 'backward',
+    'compatibility', 'reference', 'implementation', 'specification',
+)
+
+
+def make_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_peps(count=700, seed=0):
+    """Возвращает список (номер, тип, буква статуса, статус)."""
+    rng = random.Random(seed)
+    return [
+        (number, rng.choice(PEP_TYPES), *rng.choice(PEP_STATUSES))
+        for number in range(1, count + 1)
+    ]
+
+
+def pep_page(number, status, sections=12, seed=None):
+    rng = random.Random(number if seed is None else seed)
+    nav = ''.join(
+        f'<li><a href="/pep-{i:04d}/">PEP {i}</a></li>' for i in range(40)
+    )
+    body = ''.join(
+        PEP_SECTION.format(
+            index=index,
+            text=make_text(rng, 300),
+            code=make_text(rng, 40),
+        )
+        for index in range(sections)
+    )
+    return PEP_PAGE.format(number=number, status=status, nav=nav, body=body)
+
+
+def pep_index(peps):
+    return PEP_INDEX.format(rows=''.join(
+        PEP_INDEX_ROW.format(
+            parity='odd' if index % 2 else 'even',
+            type=type_,
+            letter=letter,
+            number=number,
+        )
+        for index, (number, type_, letter, _) in enumerate(peps)
+    ))
+
+
+DOCS_HOST = 'docs.python.org'
+PEPS_HOST = 'peps.python.org'
+DOCS_INDEX = '''<!DOCTYPE html><html><body>
+<div class="sphinxsidebar"><div class="sphinxsidebarwrapper">
+<h3>Download</h3><ul><li><a href="download.html">Download these documents</a>
+</li></ul><h3>Docs by version</h3><ul>{versions}
+<li><a href="https://www.python.org/doc/versions/">All versions</a></li>
+</ul></div></div><div role="main">{body}</div></body></html>
+'''
+DOCS_VERSION = (
+    '<li><a href="https://docs.python.org/{version}/">'
+    'Python {version} ({status})</a></li>'
+)
+DOCS_VERSIONS = (
+    ('3.14', 'in development'), ('3.13', 'pre-release'),
+    ('3.12', 'stable'), ('3.11', 'security-fixes'),
+    ('3.10', 'security-fixes'), ('3.9', 'security-fixes'),
+    ('3.8', 'EOL'), ('3.7', 'EOL'), ('3.6', 'EOL'), ('2.7', 'EOL'),
+)
+WHATS_NEW_INDEX = '''<!DOCTYPE html><html><body><div role="main">
+<section id="what-s-new-in-python"><h1>What’s New in Python</h1>
+<div class="toctree-wrapper compound"><ul>{items}</ul></div>
+</section></div></body></html>
+'''
+WHATS_NEW_ITEM = (
+    '<li class="toctree-l1"><a class="reference internal" '
+    'href="{version}.html">What’s New In Python {version}</a></li>'
+)
+WHATS_NEW_PAGE = '''<!DOCTYPE html><html><body><div role="main">
+<section id="what-s-new-in-python-{slug}">
+<h1>What’s New In Python {version}<a class="headerlink" href="#">¶</a></h1>
+<dl class="field-list simple">
+<dt class="field-odd">Editor<span class="colon">:</span></dt>
+<dd class="field-odd"><p>Editor of {version}</p>
+</dd>
+</dl>
+{body}
+</section></div></body></html>
+'''
+DOWNLOAD_PAGE = '''<!DOCTYPE html><html><body><div role="main">
+<section id="download"><h1>Download</h1>
+<table class="docutils align-default"><tbody>{rows}</tbody></table>
+</section></div></body></html>
+'''
+DOWNLOAD_ROW = (
+    '<tr><td>{title}</td><td><a href="{href}">Download</a></td></tr>'
+)
+ARCHIVE_FORMATS = (
+    ('PDF (A4 paper size)', 'pdf-a4.zip'),
+    ('PDF (Letter paper size)', 'pdf-letter.zip'),
+    ('HTML', 'html.zip'),
+    ('HTML', 'html.tar.bz2'),
+    ('Plain text', 'text.zip'),
+    ('Plain text', 'text.tar.bz2'),
+    ('EPUB', 'epub'),
+)
+ARCHIVE_NAME = 'python-3.12.0-docs{separator}{suffix}'
+
+
+def archive_name(suffix):
+    separator = '.' if suffix == 'epub' else '-'
+    return ARCHIVE_NAME.format(separator=separator, suffix=suffix)
+
+
+def whats_new_versions(count=40):
+    versions = [f'3.{minor}' for minor in range(count - 7, -1, -1)]
+    return versions + [f'2.{minor}' for minor in range(6, -1, -1)]
+
+
+def write_page(corpus_dir, host, path, content):
+    target = corpus_dir / host / path
+    if path.endswith('/') or not path:
+        target = target / 'index.html'
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    target.write_bytes(content)
+    return target
+
+
+def make_archive(size, seed=0, suffix='zip'):
+    """Архив примерно заданного размера с несжимаемым содержимым.
+
+    Для суффиксов .tar.bz2 строится tar-архив, для остальных - zip.
+    """
+    rng = random.Random(seed)
+    payload = rng.randbytes(size)
+    buffer = io.BytesIO()
+    if suffix.endswith('.tar.bz2'):
+        with tarfile.open(fileobj=buffer, mode='w:bz2') as archive:
+            info = tarfile.TarInfo('docs.pdf')
+            info.size = size
+            archive.addfile(info, io.BytesIO(payload))
+    else:
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            archive.writestr('docs.pdf', payload)
+    return buffer.getvalue()
+
+
+def write_site(corpus_dir, peps=700, articles=40, archive_size=8 * 1024 ** 2):
+    """Записывает синтетическую копию всех страниц, нужных режимам парсера."""
+    rng = random.Random(0)
+    versions = ''.join(
+        DOCS_VERSION.format(version=version, status=status)
+        for version, status in DOCS_VERSIONS
+    )
+    write_page(corpus_dir, DOCS_HOST, '3/', DOCS_INDEX.format(
+        versions=versions, body=make_text(rng, 2000)))
+    article_versions = whats_new_versions(articles)
+    write_page(corpus_dir, DOCS_HOST, '3/whatsnew/', WHATS_NEW_INDEX.format(
+        items=''.join(WHATS_NEW_ITEM.format(version=version)
+                      for version in article_versions)))
+    for version in article_versions:
+        body = ''.join(
+            PEP_SECTION.format(index=index, text=make_text(rng, 400),
+                               code=make_text(rng, 60))
+            for index in range(60)
+        )
+        write_page(
+            corpus_dir, DOCS_HOST, f'3/whatsnew/{version}.html',
+            WHATS_NEW_PAGE.format(
+                version=version, slug=version.replace('.', '-'), body=body))
+    rows = ''.join(
+        DOWNLOAD_ROW.format(title=title, href=f'archives/{archive_name(sfx)}')
+        for title, sfx in ARCHIVE_FORMATS
+    )
+    write_page(corpus_dir, DOCS_HOST, '3/download.html',
+               DOWNLOAD_PAGE.format(rows=rows))
+    for index, (_, suffix) in enumerate(ARCHIVE_FORMATS):
+        write_page(
+            corpus_dir, DOCS_HOST, f'3/archives/{archive_name(suffix)}',
+            make_archive(archive_size, seed=index, suffix=suffix))
+    pep_list = make_peps(peps)
+    write_page(corpus_dir, PEPS_HOST, '', pep_index(pep_list))
+    for number, _, _, status in pep_list:
+        write_page(corpus_dir, PEPS_HOST, f'pep-{number:04d}/',
+                   pep_page(number, status))
@@ -0,0 +1,56 @@
+"""Записывает снимок страниц docs.python.org и peps.python.org в корпус.
+
+    python benchmarks/record.py CORPUS_DIR [--modes pep whats-new ...]
+
+Режимы парсера запускаются на обычной requests.Session без кеша, а каждый
+полученный GET-ответ сохраняется как <CORPUS_DIR>/<хост>/<путь>. Такой
+каталог затем раздаёт server.py.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+from benchlib import print_report
+from corpus import write_page
+import configs
+import main as parser_main
+
+
+def recorder(corpus_dir, saved):
+    def save_response(response, *args, **kwargs):
+        if response.request.method != 'GET' or response.status_code != 200:
+            return response
+        parts = urlsplit(response.url)
+        write_page(corpus_dir, parts.netloc, parts.path.lstrip('/'),
+                   response.content)
+        saved.append(response.url)
+        return response
+    return save_response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus', type=Path)
+    parser.add_argument(
+        '--modes', nargs='+', default=list(parser_main.MODE_TO_FUNCTION))
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    saved = []
+    session = requests.Session()
+    session.hooks['response'].append(recorder(args.corpus, saved))
+    arg_parser = configs.configure_argument_parser(
+        parser_main.MODE_TO_FUNCTION)
+    with tempfile.TemporaryDirectory() as workdir:
+        parser_main.BASE_DIR = Path(workdir)
+        for mode in args.modes:
+            cli_args = arg_parser.parse_args(
+                [mode, '--workers', str(args.workers)])
+            parser_main.MODE_TO_FUNCTION[mode](session, cli_args)
+    print_report({'corpus': str(args.corpus), 'pages': len(saved)})
+
+
+if __name__ == '__main__':
+    main()
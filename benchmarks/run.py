@@ -0,0 +1,160 @@
+"""Офлайн-бенчмарк режимов парсера на локальном сервере с корпусом.
+
+    python benchmarks/run.py [--corpus DIR] [--latency 0.02 --jitter 0.01]
+                             [--modes pep ...] [--mode-args "--workers 8"]
+                             [--output report.json]
+
+Каждый режим запускается в отдельном процессе дважды: с пустым кешем
+(cold) и с кешем, оставшимся после первого запуска (warm). Для каждого
+запуска сохраняются время, запросы/с, страницы/с и пиковый RSS. Без
+--corpus используется синтетический корпус из corpus.py.
+"""
+import argparse
+import datetime as dt
+import json
+import platform
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchlib import BENCH_DIR, print_report
+import corpus
+from memory import peak_rss_bytes
+from server import CorpusServer, RewriteAdapter
+
+MODES = ('whats-new', 'latest-versions', 'download', 'pep')
+CACHE_STATES = ('cold', 'warm')
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def count_calls(module, name, counter):
+    function = getattr(module, name)
+
+    def counted(*args, **kwargs):
+        counter[0] += 1
+        return function(*args, **kwargs)
+
+    setattr(module, name, counted)
+
+
+def run_child(args):
+    import logging
+
+    import configs
+    import main as parser_main
+    import utils
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = Path(args.workdir)
+    parser_main.BASE_DIR = workdir
+    session = configs.configure_session(cache_name=str(workdir / 'cache'))
+    adapter = RewriteAdapter(args.base_url).mount(session)
+    pages = [0]
+    count_calls(utils, 'get_response', pages)
+    count_calls(parser_main, 'get_response', pages)
+    cli_args = configs.configure_argument_parser(
+        parser_main.MODE_TO_FUNCTION).parse_args(
+            [args.mode, *shlex.split(args.mode_args)])
+    cli_args.mode = args.mode
+    start = time.perf_counter()
+    results = parser_main.MODE_TO_FUNCTION[args.mode](session, cli_args)
+    if results is not None:
+        results = list(results)
+    wall = time.perf_counter() - start
+    print(json.dumps({
+        'wall_seconds': round(wall, 4),
+        'requests': adapter.requests,
+        'requests_per_second': round(adapter.requests / wall, 2),
+        'bytes_transferred': adapter.bytes,
+        'pages_parsed': pages[0],
+        'pages_per_second': round(pages[0] / wall, 2),
+        'peak_rss_bytes': peak_rss_bytes(),
+    }))
+
+
+def run_mode(mode, state, base_url, workdir, mode_args):
+    completed = subprocess.run(
+        (sys.executable, str(Path(__file__).resolve()), '--child',
+         '--mode', mode, '--base-url', base_url, '--workdir', str(workdir),
+         '--mode-args', mode_args),
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return {'mode': mode, 'cache': state,
+                'error': completed.stderr.strip().splitlines()[-1:]}
+    return {'mode': mode, 'cache': state,
+            **json.loads(completed.stdout.strip().splitlines()[-1])}
+
+
+def run_suite(args, corpus_dir):
+    server = CorpusServer(
+        corpus_dir, latency=args.latency, jitter=args.jitter).start()
+    runs = []
+    try:
+        for mode in args.modes:
+            with tempfile.TemporaryDirectory() as workdir:
+                for state in CACHE_STATES:
+                    runs.append(run_mode(mode, state, server.base_url,
+                                         workdir, args.mode_args))
+    finally:
+        server.shutdown()
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'started_at': dt.datetime.now(dt.timezone.utc).isoformat(),
+        'corpus': str(args.corpus) if args.corpus else 'synthetic',
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'mode_args': args.mode_args,
+        'runs': runs,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', type=Path)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--mode-args', default='')
+    parser.add_argument('--peps', type=int, default=700)
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        run_child(args)
+        return
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = Path(synthetic_dir)
+            corpus.write_site(corpus_dir, peps=args.peps)
+        report = run_suite(args, corpus_dir)
+    if args.output is not None:
+        args.output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2),
+            encoding='utf-8')
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Локальный HTTP-сервер, раздающий корпус страниц с заданной задержкой.
+
+Корпус хранится как <каталог>/<хост>/<путь>, для путей на "/" отдаётся
+index.html. RewriteAdapter перенаправляет запросы сессии парсера к
+настоящим сайтам на этот сервер.
+"""
+import hashlib
+import mimetypes
+import random
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+RANGE_PREFIX = 'bytes='
+
+
+class CorpusHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def delay(self):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(max(0.0, server.latency + random.uniform(
+                -server.jitter, server.jitter)))
+
+    def resolve(self):
+        path = urlsplit(self.path).path.lstrip('/')
+        target = self.server.corpus_dir / path
+        if path.endswith('/') or not path or target.is_dir():
+            target = target / 'index.html'
+        return target
+
+    def send_file(self, with_body):
+        self.delay()
+        target = self.resolve()
+        if not target.is_file():
+            self.send_error(404)
+            return
+        content = target.read_bytes()
+        etag = '"{}"'.format(hashlib.md5(content).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        status, body = 200, content
+        range_header = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if range_header.startswith(RANGE_PREFIX) and if_range in (None, etag):
+            start, _, end = range_header[len(RANGE_PREFIX):].partition('-')
+            end = int(end) if end else len(content) - 1
+            status, body = 206, content[int(start):end + 1]
+        self.send_response(status)
+        content_type = mimetypes.guess_type(target.name)[0] or 'text/html'
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                start, end, len(content)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_file(with_body=True)
+
+    def do_HEAD(self):
+        self.send_file(with_body=False)
+
+
+class CorpusServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, corpus_dir, latency=0.0, jitter=0.0, port=0):
+        super().__init__(('127.0.0.1', port), CorpusHandler)
+        self.corpus_dir = corpus_dir
+        self.latency = latency
+        self.jitter = jitter
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class RewriteAdapter(HTTPAdapter):
+    """Отправляет https://<хост>/<путь> на <base_url><хост>/<путь>.
+
+    Считает сетевые запросы и переданные байты; в кеш сессии ответы
+    попадают под исходными адресами.
+    """
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+        self.requests = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        original_url = request.url
+        parts = urlsplit(original_url)
+        request.url = '{}{}{}'.format(
+            self.base_url, parts.netloc,
+            parts.path + ('?' + parts.query if parts.query else ''))
+        response = super().send(request, **kwargs)
+        request.url = original_url
+        response.url = original_url
+        with self.lock:
+            self.requests += 1
+            if request.method != 'HEAD':
+                self.bytes += int(response.headers.get('Content-Length', 0))
+        return response
+
+    def mount(self, session):
+        session.mount('https://', self)
+        return self
@@ -0,0 +1,135 @@
+import json
+import threading
+import zlib
+from pathlib import Path
+
+from constants import CACHE_FILESYSTEM, CACHE_MEMORY, CACHE_SQLITE
+
+MEGABYTE = 1024 ** 2
+
+
+def make_serializer():
+    """Pickle-сериализатор requests-cache со сжатием тел через zlib."""
+    from requests_cache.serializers import (SerializerPipeline, Stage,
+                                            pickle_serializer)
+    return SerializerPipeline(
+        [*pickle_serializer.stages,
+         Stage(zlib, dumps='compress', loads='decompress')],
+        name='pickle-zlib',
+        is_binary=True,
+    )
+
+
+def make_backend(name, cache_name, max_size=None):
+    from requests_cache.backends import FileCache, SQLiteCache
+    if name == CACHE_MEMORY:
+        return CACHE_MEMORY
+    if name == CACHE_FILESYSTEM:
+        # Файловый кеш сам вытесняет давно не читавшиеся записи (LRU).
+        kwargs = {} if max_size is None else {'max_cache_bytes': max_size}
+        return FileCache(
+            cache_name, serializer=make_serializer(), **kwargs)
+    if name == CACHE_SQLITE:
+        # WAL позволяет потокам читать кеш, пока другой поток пишет.
+        return SQLiteCache(cache_name, serializer=make_serializer(), wal=True)
+    raise ValueError(f'Неизвестное хранилище кеша: {name}')
+
+
+def sqlite_entry_sizes(responses):
+    """Размеры записей SQLite-кеша, от давнее всех сохранённых.
+
+    Ответ сохраняется через INSERT OR REPLACE, поэтому rowid записи растёт
+    при каждом сохранении, в том числе после перепроверки с ответом 304.
+    """
+    with responses.connection() as connection:
+        return connection.execute(
+            f'SELECT key, LENGTH(value) FROM {responses.table_name} '
+            'ORDER BY rowid'
+        ).fetchall()
+
+
+def cache_size(cache):
+    """Объём хранимых ответов в байтах.
+
+    Для SQLite считаются сами записи: в режиме WAL свежие данные лежат
+    в отдельном журнале, и размер файла базы их не отражает.
+    """
+    from requests_cache.backends import SQLiteCache
+    responses = cache.responses
+    if isinstance(cache, SQLiteCache):
+        return sum(size for _, size in sqlite_entry_sizes(responses))
+    if hasattr(responses, 'size'):
+        return responses.size()
+    return sum(response.size for response in responses.values())
+
+
+def prune_cache(cache, max_size):
+    """Вытесняет записи SQLite-кеша, пока он не уложится в max_size байт.
+
+    Первыми уходят записи, которые дольше всех не сохранялись. Просроченные
+    записи не удаляются заранее: их ETag нужен для условных запросов, а
+    тело - для stale_if_error.
+    """
+    from requests_cache.backends import SQLiteCache
+    if max_size is None or not isinstance(cache, SQLiteCache):
+        return 0
+    responses = cache.responses
+    rows = sqlite_entry_sizes(responses)
+    excess = sum(size for _, size in rows) - max_size
+    if excess <= 0:
+        return 0
+    evicted = []
+    for key, size in rows:
+        if excess <= 0:
+            break
+        evicted.append(key)
+        excess -= size
+    responses.bulk_delete(evicted)
+    responses.vacuum()
+    return len(evicted)
+
+
+class CacheStats:
+    """Счётчики попаданий в кеш, накапливаемые между запусками."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, response):
+        from_cache = getattr(response, 'from_cache', False)
+        with self.lock:
+            if from_cache:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def load(path):
+        try:
+            totals = json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {'hits': 0, 'misses': 0}
+        return {
+            'hits': totals.get('hits', 0),
+            'misses': totals.get('misses', 0),
+        }
+
+    def save(self, path):
+        """Добавляет накопленные счётчики к сохранённым и обнуляет их."""
+        with self.lock:
+            hits, misses = self.hits, self.misses
+            self.hits = self.misses = 0
+        if not hits and not misses:
+            return
+        path = Path(path)
+        totals = self.load(path)
+        totals['hits'] += hits
+        totals['misses'] += misses
+        temp_path = path.with_name(path.name + '.tmp')
+        temp_path.write_text(json.dumps(totals), encoding='utf-8')
+        temp_path.replace(path)
+
+
+CACHE_STATS = CacheStats()
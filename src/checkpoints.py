@@ -0,0 +1,68 @@
+"""Контрольные точки долгих обходов для продолжения после прерывания."""
+import json
+import threading
+from contextlib import contextmanager
+
+from constants import CHECKPOINT_FLUSH_EVERY
+
+
+class Checkpoint:
+    """Журнал готовых строк в формате JSON Lines: [ключ, значение].
+
+    Строки дописываются по мере готовности и сбрасываются на диск каждые
+    CHECKPOINT_FLUSH_EVERY записей. Недописанная при аварии последняя
+    строка отбрасывается при загрузке.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = self.load() if resume else {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        self.lock = threading.Lock()
+        self.unflushed = 0
+
+    def load(self):
+        if not self.path.exists():
+            return {}
+        done = {}
+        valid_size = 0
+        with open(self.path, 'rb') as file:
+            for line in file:
+                try:
+                    key, value = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                done[key] = value
+                valid_size += len(line)
+        with open(self.path, 'r+b') as file:
+            file.truncate(valid_size)
+        return done
+
+    def add(self, key, value):
+        line = json.dumps([key, value], ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.unflushed += 1
+            if self.unflushed >= CHECKPOINT_FLUSH_EVERY:
+                self.file.flush()
+                self.unflushed = 0
+
+    def close(self, finished):
+        self.file.close()
+        if finished:
+            self.path.unlink(missing_ok=True)
+
+
+@contextmanager
+def checkpoint(path, resume=False):
+    """Открывает контрольную точку; при успешном завершении удаляет её."""
+    journal = Checkpoint(path, resume)
+    try:
+        yield journal
+    except BaseException:
+        journal.close(finished=False)
+        raise
+    journal.close(finished=True)
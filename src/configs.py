@@ -2,17 +2,84 @@ import argparse
 import logging
 from logging.handlers import RotatingFileHandler
 
-from constants import LOG_DIR, LOG_FILE, OUTPUT_FILE, OUTPUT_PRETTY
+from constants import (CACHE_EXPIRE_AFTER,
+                       CACHE_FILESYSTEM,
+                       CACHE_MAX_SIZE_MB,
+                       CACHE_MEMORY,
+                       CACHE_NAME,
+                       CACHE_SQLITE,
+                       CACHE_URLS_EXPIRE_AFTER,
+                       DEFAULT_BURST,
+                       DEFAULT_DOWNLOAD_FORMATS,
+                       DEFAULT_RATE,
+                       DEFAULT_RETRIES,
+                       DEFAULT_WORKERS,
+                       DOWNLOAD_FORMATS,
+                       ENGINE_BS4,
+                       ENGINE_LXML,
+                       LOG_DIR,
+                       LOG_FILE,
+                       OUTPUT_FILE,
+                       OUTPUT_JSONL,
+                       OUTPUT_PRETTY,
+                       OUTPUT_SQLITE,
+                       PEP_JSON_URL,
+                       PROFILE_STDOUT)
 
 
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
+POSITIVE_INT_ERROR = 'Ожидается целое число больше нуля, получено: {}'
+NON_NEGATIVE_INT_ERROR = 'Ожидается целое неотрицательное число, получено: {}'
+POSITIVE_FLOAT_ERROR = 'Ожидается число больше нуля, получено: {}'
+SHARD_ERROR = 'Ожидается часть в виде K/N, где 1 <= K <= N, получено: {}'
+
+
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(POSITIVE_INT_ERROR.format(value))
+    if number < 1:
+        raise argparse.ArgumentTypeError(POSITIVE_INT_ERROR.format(value))
+    return number
+
+
+def non_negative_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(NON_NEGATIVE_INT_ERROR.format(value))
+    if number < 0:
+        raise argparse.ArgumentTypeError(NON_NEGATIVE_INT_ERROR.format(value))
+    return number
+
+
+def positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(POSITIVE_FLOAT_ERROR.format(value))
+    if number <= 0:
+        raise argparse.ArgumentTypeError(POSITIVE_FLOAT_ERROR.format(value))
+    return number
+
+
+def shard(value):
+    try:
+        number, total = map(int, value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(SHARD_ERROR.format(value))
+    if not 1 <= number <= total:
+        raise argparse.ArgumentTypeError(SHARD_ERROR.format(value))
+    return number, total
 
 
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -25,9 +92,149 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(OUTPUT_PRETTY, OUTPUT_FILE),
+        choices=(OUTPUT_PRETTY, OUTPUT_FILE, OUTPUT_SQLITE, OUTPUT_JSONL),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help='Количество одновременно загружаемых страниц'
+    )
+    parser.add_argument(
+        '--parse-processes',
+        type=non_negative_int,
+        default=0,
+        metavar='N',
+        help='Разбирать страницы в N процессах (0 - в потоках загрузки)'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=DEFAULT_RETRIES,
+        help='Количество повторов запроса при сетевых ошибках и 5xx/429'
+    )
+    parser.add_argument(
+        '--rate',
+        type=positive_float,
+        default=DEFAULT_RATE,
+        help='Допустимое число запросов в секунду к одному хосту'
+    )
+    parser.add_argument(
+        '--burst',
+        type=positive_int,
+        default=DEFAULT_BURST,
+        help='Сколько запросов к хосту можно отправить без ожидания'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=(CACHE_SQLITE, CACHE_FILESYSTEM, CACHE_MEMORY),
+        default=CACHE_SQLITE,
+        help='Хранилище HTTP-кеша'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=positive_int,
+        default=CACHE_MAX_SIZE_MB,
+        metavar='MB',
+        help='Максимальный размер HTTP-кеша в мегабайтах'
+    )
+    parser.add_argument(
+        '--pep-json',
+        nargs='?',
+        const=PEP_JSON_URL,
+        metavar='URL_OR_PATH',
+        help=('Брать статусы PEP из JSON-индекса (по умолчанию с '
+              'peps.python.org) вместо страниц PEP')
+    )
+    parser.add_argument(
+        '--cross-check',
+        type=positive_int,
+        metavar='N',
+        help='Сверить статусы из JSON со страницами N случайных PEP'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=DOWNLOAD_FORMATS,
+        default=DEFAULT_DOWNLOAD_FORMATS,
+        help='Форматы архивов документации для режима download'
+    )
+    parser.add_argument(
+        '--segments',
+        type=positive_int,
+        default=1,
+        metavar='N',
+        help='Скачивать большие архивы N параллельными диапазонами'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard,
+        metavar='K/N',
+        help=('Обработать K-ю из N частей индекса PEP; части собираются '
+              'режимом merge')
+    )
+    parser.add_argument(
+        '--shards',
+        type=positive_int,
+        metavar='N',
+        help='Собрать в режиме merge части разбиения на N частей'
+    )
+    parser.add_argument(
+        '--max-memory',
+        type=positive_int,
+        metavar='MB',
+        help=('Не ставить в очередь новые страницы, пока процесс занимает '
+              'больше MB мегабайт')
+    )
+    parser.add_argument(
+        '--engine',
+        choices=(ENGINE_BS4, ENGINE_LXML),
+        default=ENGINE_BS4,
+        help='Движок извлечения статуса на страницах PEP'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Загружать только новые, изменившиеся и устаревшие PEP'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help=('Продолжить прерванный обход pep или whats-new с контрольной '
+              'точки')
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Передавать строки результатов в вывод по мере получения'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=PROFILE_STDOUT,
+        metavar='PATH',
+        help='Вывести или сохранить в PATH отчёт о времени этапов (JSON)'
+    )
+    parser.add_argument(
+        '--watch',
+        type=positive_float,
+        metavar='SECONDS',
+        help=('Перезапускать режимы каждые SECONDS секунд и выводить '
+              'только изменившиеся результаты')
+    )
+    snapshot_group = parser.add_mutually_exclusive_group()
+    snapshot_group.add_argument(
+        '--snapshot-write',
+        metavar='PATH',
+        help='Записать все полученные ответы в архив снимка PATH'
+    )
+    snapshot_group.add_argument(
+        '--snapshot-read',
+        metavar='PATH',
+        help='Работать без сети, отвечая на запросы из архива снимка PATH'
+    )
     return parser
 
 
@@ -43,3 +250,27 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler())
     )
+
+
+def configure_session(pool_size=DEFAULT_WORKERS, retries=DEFAULT_RETRIES,
+                      rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                      cache_backend=CACHE_SQLITE, cache_max_size=None,
+                      cache_name=CACHE_NAME, **kwargs):
+    import requests_cache
+
+    from cache import make_backend
+    from transport import mount_transport
+
+    if 'backend' not in kwargs:
+        kwargs['backend'] = make_backend(
+            cache_backend, cache_name, cache_max_size)
+
+    # Просроченные ответы с ETag/Last-Modified перепроверяются условным
+    # запросом: при 304 тело берётся из кеша.
+    session = requests_cache.CachedSession(
+        expire_after=CACHE_EXPIRE_AFTER,
+        urls_expire_after=CACHE_URLS_EXPIRE_AFTER,
+        stale_if_error=True,
+        **kwargs
+    )
+    return mount_transport(session, pool_size, retries, rate, burst)
@@ -1,17 +1,74 @@
+from datetime import timedelta
 from urllib.parse import urljoin
 from pathlib import Path
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 MAIN_PEP_URL = 'https://peps.python.org/'
+PEP_JSON_URL = 'https://peps.python.org/api/peps.json'
 
 BASE_DIR = Path(__file__).parent
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
 OUTPUT_PRETTY = 'pretty'
+MODE_ALL = 'all'
+MODE_CACHE_STATS = 'cache-stats'
+MODE_MERGE = 'merge'
 OUTPUT_FILE = 'file'
+OUTPUT_JSONL = 'jsonl'
+OUTPUT_SQLITE = 'sqlite'
 WHATS_NEW_URL = urljoin(MAIN_DOC_URL, 'whatsnew/')
 
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
+OUTPUT_BATCH_SIZE = 20
+CHECKPOINT_FLUSH_EVERY = 20
+
+DEFAULT_WORKERS = 1
+DEFAULT_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 10
+LATENCY_SLOWDOWN = 3
+MIN_RATE_SHARE = 0.1
+THROTTLE_STATUSES = (429, 503)
+ENGINE_BS4 = 'bs4'
+ENGINE_LXML = 'lxml'
+PROFILE_STDOUT = '-'
+
+PEP_SNAPSHOT_MAX_AGE = timedelta(days=7)
+
+CACHE_NAME = BASE_DIR / 'http_cache'
+CACHE_STATS_FILE = 'http_cache_stats.json'
+CACHE_SQLITE = 'sqlite'
+CACHE_FILESYSTEM = 'filesystem'
+CACHE_MEMORY = 'memory'
+CACHE_MAX_SIZE_MB = 256
+CACHE_EXPIRE_AFTER = timedelta(days=1)
+# Порядок важен: используется первый подходящий шаблон.
+CACHE_URLS_EXPIRE_AFTER = {
+    'peps.python.org/pep-': timedelta(days=7),
+    'peps.python.org': timedelta(hours=1),
+    'docs.python.org/3/whatsnew/3.': timedelta(days=7),
+    'docs.python.org/3/whatsnew/': timedelta(hours=1),
+    'docs.python.org/3/download.html': timedelta(hours=1),
+    'docs.python.org/3/': timedelta(hours=1),
+}
+DOWNLOAD_CHUNK_SIZE = 1024 ** 2
+DOWNLOAD_SEGMENT_MIN_SIZE = 4 * 1024 ** 2
+# Формат архива -> окончание ссылки в таблице на странице загрузок.
+DOWNLOAD_FORMATS = {
+    'pdf-a4': 'pdf-a4.zip',
+    'pdf-letter': 'pdf-letter.zip',
+    'html-zip': 'html.zip',
+    'html-tar': 'html.tar.bz2',
+    'text-zip': 'text.zip',
+    'text-tar': 'text.tar.bz2',
+    'epub': '.epub',
+}
+DEFAULT_DOWNLOAD_FORMATS = ('pdf-a4',)
 
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
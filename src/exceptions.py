@@ -1,2 +1,6 @@
 class ParserFindTagException(Exception):
     """Вызывается, когда парсер не может найти тег."""
+
+
+class DownloadVerificationError(Exception):
+    """Вызывается, когда скачанный архив не прошёл проверку."""
@@ -0,0 +1,71 @@
+from functools import lru_cache
+
+from constants import ENGINE_LXML
+from exceptions import ParserFindTagException
+from utils import find_tag, make_soup
+
+ARTICLE_TARGET = (['h1', 'dl'], None)
+PEP_CONTENT_TARGET = ('section', {'id': 'pep-content'})
+STATUS_DT_TEXT = 'Status:'
+STATUS_NOT_FOUND = 'Тег Status: не найден!'
+STATUS_XPATH = (
+    '//section[@id="pep-content"]'
+    '//dt[normalize-space()=$dt_text]/following-sibling::dd[1]'
+)
+
+
+@lru_cache(maxsize=None)
+def status_xpath():
+    from lxml import etree
+    return etree.XPath(STATUS_XPATH)
+
+
+def status_from_soup(soup):
+    section = soup.find('section', {'id': 'pep-content'})
+    if section is None:
+        return None
+    for dt in section.find_all('dt'):
+        if dt.get_text(strip=True) == STATUS_DT_TEXT:
+            return dt.find_next_sibling('dd').get_text(strip=True)
+    return None
+
+
+def status_from_tree(content):
+    from lxml import etree, html
+    try:
+        tree = html.fromstring(content)
+    except (etree.ParserError, ValueError):
+        return None
+    dd_tags = status_xpath()(tree, dt_text=STATUS_DT_TEXT)
+    if not dd_tags:
+        return None
+    return ''.join(text.strip() for text in dd_tags[0].itertext())
+
+
+def extract_pep_status(content, engine=None):
+    """Достаёт значение поля Status: из байтов страницы PEP.
+
+    Движок lxml выполняет заранее скомпилированный XPath; если разметка
+    не совпала, используется разбор через BeautifulSoup.
+    """
+    if engine == ENGINE_LXML:
+        status_value = status_from_tree(content)
+        if status_value is not None:
+            return status_value
+    soup = make_soup(content, parse_only=PEP_CONTENT_TARGET)
+    status_value = status_from_soup(soup)
+    # Дерево из взаимных ссылок иначе ждёт сборщика циклов.
+    soup.decompose()
+    if status_value is None:
+        raise ParserFindTagException(STATUS_NOT_FOUND)
+    return status_value
+
+
+def extract_article(content):
+    """Возвращает заголовок и текст первого dl статьи What's New."""
+    soup = make_soup(content, parse_only=ARTICLE_TARGET)
+    h1 = find_tag(soup, 'h1')
+    dl = soup.find('dl')
+    article = h1.text, dl.text.replace('\n', ' ')
+    soup.decompose()
+    return article
@@ -1,63 +1,194 @@
+from argparse import Namespace
 from collections import defaultdict
+from functools import partial
+import hashlib
+import json
 import logging
+import random
 import re
-from urllib.parse import urljoin
+import signal
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 
-import requests_cache
-from tqdm import tqdm
-
-from exceptions import ParserFindTagException
+from cache import CACHE_STATS, MEGABYTE, CacheStats, cache_size, prune_cache
+from exceptions import DownloadVerificationError, ParserFindTagException
+from extractors import extract_article, extract_pep_status
+from memory import peak_rss_bytes
 from constants import (BASE_DIR,
+                       CACHE_MAX_SIZE_MB,
+                       CACHE_SQLITE,
+                       CACHE_STATS_FILE,
+                       DEFAULT_DOWNLOAD_FORMATS,
+                       DEFAULT_WORKERS,
+                       DOWNLOAD_FORMATS,
+                       ENGINE_BS4,
                        EXPECTED_STATUS,
                        MAIN_DOC_URL,
                        MAIN_PEP_URL,
+                       MODE_ALL,
+                       MODE_CACHE_STATS,
+                       MODE_MERGE,
+                       PEP_SNAPSHOT_MAX_AGE,
+                       PROFILE_STDOUT,
                        WHATS_NEW_URL)
-from configs import configure_argument_parser, configure_logging
-from outputs import control_output
-from utils import find_tag, get_soup
+from configs import (configure_argument_parser,
+                     configure_logging,
+                     configure_session)
+from outputs import control_output, output_run
+from pep_snapshot import (get_validators,
+                          is_fresh,
+                          pep_number,
+                          load_snapshot,
+                          make_entry,
+                          save_snapshot)
+from profiling import PROFILER, stage
+from records import (CacheStatRow,
+                     PepRecord,
+                     StatusCountRow,
+                     VersionRow,
+                     WhatsNewRow)
+from utils import (PageCache,
+                   download_file,
+                   get_response,
+                   get_soup,
+                   imap_bounded,
+                   parse_inline,
+                   parser_pool)
 
 
 ARGUMENTS = 'Аргументы командной строки: {}'
+CHECKPOINTS_FOLDER = 'checkpoints'
+CROSS_CHECK_BODY = '\n{}\nСтатус в JSON: {}\nСтатус на странице: {}'
+CROSS_CHECK_HEAD = 'Сверка JSON со страницами: проверено {}, расхождений {}'
+CACHE_EVICTED = 'Из кеша вытеснено записей: {}'
 DOWNLOADS_FOLDER = 'downloads'
 DOWNLOAD_ARCHIVE = 'Архив был загружен и сохранён: {}'
+DOWNLOAD_SKIPPED = 'Архив не изменился, загрузка пропущена: {}'
+DOWNLOAD_THROUGHPUT = 'Загружено {:.1f} МБ за {:.1f} с ({:.1f} МБ/с)'
 EXCEPTION_TEXT = 'Возникло исключение: {}'
+FORMAT_NOT_FOUND = 'Формат {} не найден на странице загрузок'
+MODE_EXCEPTION_TEXT = 'Режим {} завершился с ошибкой: {}'
+INCREMENTAL_TEXT = 'PEP к загрузке: {} из {}'
 PARSER_OFF = 'Парсер завершил работу.'
 PARSER_ON = 'Парсер запущен!'
+PEAK_RSS_TEXT = 'Пиковое потребление памяти: {} МБ'
+PEP_JSON_MISSING = 'PEP отсутствует в JSON-индексе'
+PEP_SNAPSHOT_FILE = 'pep.json'
+SHARDS_FOLDER = 'shards'
+SHARD_SAVED = 'Часть результатов PEP сохранена: {}'
+SNAPSHOTS_FOLDER = 'snapshots'
 TAG_FIND_ERROR = 'Тег {} не найден!'
 TAG_TEXT_FIND_ERROR = 'All versions не найден!'
 URL_ERROR_TEXT = 'Не удалось обработать url {}: {}'
+WATCH_STOP = 'Получен сигнал {}, наблюдение завершается'
+WATCH_UNCHANGED = 'Результаты режима {} не изменились'
 WRONG_STATUSES_BODY = '\n{}\nСтатус в карточке: {}\nОжидаемые статусы: {}'
 WRONG_STATUSES_END = '\nНесовпадающие статусы отсутствуют!'
 WRONG_STATUSES_HEAD = 'Несовпадающие статусы:'
 
+DOWNLOAD_TARGET = ('div', {'role': 'main'})
+PEP_INDEX_TARGET = ('section', {'id': 'numerical-index'})
+SIDEBAR_TARGET = ('div', {'class': 'sphinxsidebarwrapper'})
+WHATS_NEW_TARGET = ('section', {'id': 'what-s-new-in-python'})
+
+
+def checkpoint_path(name):
+    return BASE_DIR / CHECKPOINTS_FOLDER / f'{name}.jsonl'
+
+
+def connection_pool_size(args):
+    """Наибольшее число одновременных запросов к одному хосту за запуск."""
+    mode_args = get_mode_args(args)
+    size = args.workers * len(mode_args)
+    if any(cli_args.mode == 'download' for cli_args in mode_args):
+        size += len(args.formats) * args.segments
+    return size
+
+
+def max_memory_bytes(cli_args):
+    max_memory = getattr(cli_args, 'max_memory', None)
+    return None if max_memory is None else max_memory * MEGABYTE
+
+
+def fetch_whats_new_row(session, version_link, parse=parse_inline):
+    try:
+        content = get_response(session, version_link).content
+    except ConnectionError as e:
+        return version_link, None, None, e
+    with stage('extract.whats-new'):
+        h1, dl_text = parse(extract_article, content)
+    return version_link, h1, dl_text, None
+
+
+def iter_whats_new(session, version_links, workers=DEFAULT_WORKERS,
+                   logging_message=None, parse=parse_inline, max_memory=None,
+                   journal=None):
+    """Выдаёт строки статей по порядку version_links.
+
+    Статьи, уже сохранённые в контрольной точке journal, не загружаются
+    повторно, а новые успешно обработанные статьи дописываются в неё.
+    """
+    from tqdm import tqdm
+    done = {} if journal is None else journal.done
+    with tqdm(total=len(version_links)) as progress:
+        fetched = imap_bounded(
+            partial(fetch_whats_new_row, session, parse=parse),
+            [link for link in version_links if link not in done],
+            workers,
+            on_done=progress.update,
+            max_memory=max_memory)
+        for link in version_links:
+            if link in done:
+                progress.update()
+                yield WhatsNewRow(link, *done[link])
+                continue
+            version_link, h1, dl_text, error = next(fetched)
+            if error is not None:
+                if logging_message is not None:
+                    logging_message.append(
+                        URL_ERROR_TEXT.format(version_link, error))
+                continue
+            if journal is not None:
+                journal.add(version_link, [h1, dl_text])
+            yield WhatsNewRow(version_link, h1, dl_text)
+
+
+def stream_whats_new(session, version_links, workers=DEFAULT_WORKERS,
+                     processes=0, max_memory=None, resume=False):
+    from checkpoints import checkpoint
 
-def whats_new(session):
-    a_tags = (get_soup(
-        session,
-        url=WHATS_NEW_URL).select(
-            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'))
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор')]
     logging_message = []
-    for a_tag in tqdm(a_tags):
-        href = a_tag['href']
-        version_link = urljoin(WHATS_NEW_URL, href)
-        try:
-            soup = get_soup(session, url=version_link)
-        except ConnectionError as e:
-            logging_message.append(URL_ERROR_TEXT.format(version_link, e))
-            continue
-        h1 = find_tag(soup, 'h1')
-        dl = soup.find('dl')
-        dl_text = dl.text.replace('\n', ' ')
-        results.append((version_link, h1.text, dl_text))
+    yield WhatsNewRow.HEADER
+    with checkpoint(checkpoint_path('whats-new'), resume) as journal, \
+            parser_pool(processes) as parse:
+        yield from iter_whats_new(session, version_links, workers,
+                                  logging_message, parse, max_memory, journal)
     if logging_message:
         logging.error('\n'.join(logging_message))
 
-    return results
+
+def whats_new(session, cli_args=None):
+    workers = getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    a_tags = (get_soup(
+        session,
+        url=WHATS_NEW_URL,
+        parse_only=WHATS_NEW_TARGET).select(
+            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'))
+    version_links = [urljoin(WHATS_NEW_URL, a_tag['href']) for a_tag in a_tags]
+    results = stream_whats_new(
+        session, version_links, workers,
+        getattr(cli_args, 'parse_processes', 0), max_memory_bytes(cli_args),
+        getattr(cli_args, 'resume', False))
+    if getattr(cli_args, 'stream', False):
+        return results
+    return list(results)
 
 
-def latest_versions(session):
-    sidebar = get_soup(session, url=MAIN_DOC_URL).find(
+def latest_versions(session, cli_args=None):
+    sidebar = get_soup(
+        session, url=MAIN_DOC_URL, parse_only=SIDEBAR_TARGET).find(
         'div',
         {'class': 'sphinxsidebarwrapper'})
     ul_tags = sidebar.find_all('ul')
@@ -68,39 +199,98 @@ def latest_versions(session):
     else:
         raise ParserFindTagException(TAG_TEXT_FIND_ERROR)
     pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
+    results = [VersionRow.HEADER]
     for a_tag in a_tags:
-        text_match = re.search(pattern, a_tag.text)
-        if text_match is not None:
-            version, status = text_match.groups()
-        else:
-            version, status = a_tag.text, ''
-        results.append(
-            (a_tag['href'], version, status)
-        )
+        with stage('extract.latest-versions'):
+            text_match = re.search(pattern, a_tag.text)
+            if text_match is not None:
+                version, status = text_match.groups()
+            else:
+                version, status = a_tag.text, ''
+        results.append(VersionRow(a_tag['href'], version, status))
     return results
 
 
-def download(session):
+def find_archive_urls(table_tag, downloads_url, formats):
+    archive_urls = []
+    for archive_format in formats:
+        suffix = DOWNLOAD_FORMATS[archive_format]
+        a_tag = table_tag.find(
+            'a', href=lambda href: href is not None and href.endswith(suffix))
+        if a_tag is None:
+            logging.warning(FORMAT_NOT_FOUND.format(archive_format))
+            continue
+        archive_urls.append(urljoin(downloads_url, a_tag['href']))
+    return archive_urls
+
+
+def download_archive(session, archive_url, downloads_dir, segments=1):
+    archive_path = downloads_dir / archive_url.split('/')[-1]
+    try:
+        downloaded = download_file(
+            session, archive_url, archive_path, segments=segments)
+    except (ConnectionError, DownloadVerificationError) as e:
+        return archive_url, archive_path, None, e
+    return archive_url, archive_path, downloaded, None
+
+
+def download(session, cli_args=None):
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    table_tag = get_soup(session, url=downloads_url).select_one(
+    table_tag = get_soup(
+        session, url=downloads_url, parse_only=DOWNLOAD_TARGET).select_one(
         'div[role="main"] table.docutils')
-    pdf_a4_link = table_tag.find('a',
-                                 href=re.compile(r'.+pdf-a4\.zip$'))['href']
-    archive_url = urljoin(downloads_url, pdf_a4_link)
-    filename = archive_url.split('/')[-1]
+    with stage('extract.download'):
+        archive_urls = find_archive_urls(
+            table_tag, downloads_url,
+            getattr(cli_args, 'formats', DEFAULT_DOWNLOAD_FORMATS))
     DOWNLOADS_DIR = BASE_DIR / DOWNLOADS_FOLDER
     DOWNLOADS_DIR.mkdir(exist_ok=True)
-    archive_path = DOWNLOADS_DIR / filename
-    response = session.get(archive_url)
-    logging.info(DOWNLOAD_ARCHIVE.format(archive_path))
+    logging_message_url = []
+    downloaded_bytes = 0
+    start = time.perf_counter()
+    for archive_url, archive_path, downloaded, error in imap_bounded(
+            partial(download_archive, session,
+                    downloads_dir=DOWNLOADS_DIR,
+                    segments=getattr(cli_args, 'segments', 1)),
+            archive_urls,
+            len(archive_urls)):
+        if error is not None:
+            logging_message_url.append(
+                URL_ERROR_TEXT.format(archive_url, error))
+        elif downloaded:
+            downloaded_bytes += archive_path.stat().st_size
+            logging.info(DOWNLOAD_ARCHIVE.format(archive_path))
+        else:
+            logging.info(DOWNLOAD_SKIPPED.format(archive_path))
+    elapsed = time.perf_counter() - start
+    logging.info(DOWNLOAD_THROUGHPUT.format(
+        downloaded_bytes / MEGABYTE, elapsed,
+        downloaded_bytes / MEGABYTE / elapsed if elapsed else 0))
+    if logging_message_url:
+        logging.error('\n'.join(logging_message_url))
+
 
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
+def find_pep_status(session, pep_link, engine=ENGINE_BS4, parse=parse_inline):
+    response = get_response(session, pep_link)
+    with stage('extract.pep'):
+        status_value = parse(extract_pep_status, response.content, engine)
+    return status_value, get_validators(response.headers)
 
 
-def pep(session):
-    section = get_soup(session, url=MAIN_PEP_URL).find(
+def fetch_pep_row(session, row, engine=ENGINE_BS4, parse=parse_inline):
+    status_letter, pep_link = row
+    try:
+        status_value, validators = find_pep_status(
+            session, pep_link, engine, parse)
+        return PepRecord(status_letter, pep_link, status_value,
+                         validators=validators)
+    except (ConnectionError, ParserFindTagException) as e:
+        return PepRecord(status_letter, pep_link, error=e)
+
+
+def get_pep_rows(session):
+    section = get_soup(
+        session, url=MAIN_PEP_URL, parse_only=PEP_INDEX_TARGET).find(
         'section',
         {'id': 'numerical-index'})
     table = section.find(
@@ -108,28 +298,41 @@ def pep(session):
         {'class': 'pep-zero-table docutils align-default'},
         )
     tbody = table.find('tbody')
-    tr_tags = tbody.find_all('tr')
+    rows = []
+    for tr in tbody.find_all('tr'):
+        td = tr.find_all('td')
+        status_letter = (td[0].text[1]) if len(td[0].text) > 1 else ''
+        a_tag = tr.find('a')
+        rows.append((status_letter, urljoin(MAIN_PEP_URL, a_tag['href'])))
+    return rows
+
+
+class PepReport(list):
+    """Строки отчёта pep и сообщения о расхождениях и ошибках загрузки."""
+
+    def __init__(self, rows, messages):
+        super().__init__(rows)
+        self.messages = messages
+
+    def log(self):
+        for level, message in self.messages:
+            logging.log(level, message)
+
+
+def build_pep_report(records, cli_args=None):
+    """Считает статусы и журналирует расхождения и ошибки.
+
+    В режиме --watch сообщения не журналируются сразу: их выводит
+    ChangedOutput, только если отчёт изменился.
+    """
     results = defaultdict(int)
     logging_message_status = WRONG_STATUSES_HEAD
     errors_counter = 0
     logging_message_url = []
-    for tr in tr_tags:
-        td = tr.find_all('td')
-        status_letter = (td[0].text[1]) if len(td[0].text) > 1 else ''
-        a_tag = tr.find('a')
-        pep_link = urljoin(MAIN_PEP_URL, a_tag['href'])
-        try:
-            section = get_soup(session, pep_link).find(
-                'section',
-                {'id': 'pep-content'})
-        except ValueError as e:
-            logging_message_url.append(URL_ERROR_TEXT.format(pep_link, e))
+    for status_letter, pep_link, status_value, error, _ in records:
+        if error is not None:
+            logging_message_url.append(URL_ERROR_TEXT.format(pep_link, error))
             continue
-        dt_tags = section.find_all('dt')
-        for dt in dt_tags:
-            if dt.get_text(strip=True) == 'Status:':
-                status_value = dt.find_next_sibling('dd').get_text(
-                    strip=True)
         if status_value not in EXPECTED_STATUS[status_letter]:
             logging_message_status += (
                 WRONG_STATUSES_BODY.format(
@@ -140,14 +343,165 @@ def pep(session):
         results[status_value] += 1
     if errors_counter == 0:
         logging_message_status += WRONG_STATUSES_END
+    messages = []
     if logging_message_url:
-        logging.error('\n'.join(logging_message_url))
-    logging.info(logging_message_status)
-    return [
-        ('Статус', 'Количество'),
-        *results.items(),
-        ('Всего', sum(results.values())),
-    ]
+        messages.append((logging.ERROR, '\n'.join(logging_message_url)))
+    messages.append((logging.INFO, logging_message_status))
+    report = PepReport([
+        StatusCountRow.HEADER,
+        *(StatusCountRow(*item) for item in results.items()),
+        StatusCountRow('Всего', sum(results.values())),
+    ], messages)
+    if getattr(cli_args, 'watch', None) is None:
+        report.log()
+    return report
+
+
+def fetch_pep_records(session, rows, cli_args, journal):
+    """Загружает статусы PEP, пропуская строки из контрольной точки."""
+    fetched = {}
+    for status_letter, pep_link in rows:
+        done = journal.done.get(pep_link)
+        if done is not None and done['letter'] == status_letter:
+            fetched[pep_link] = PepRecord(
+                status_letter, pep_link, done['status'],
+                validators=done['validators'])
+    engine = getattr(cli_args, 'engine', ENGINE_BS4)
+    with parser_pool(getattr(cli_args, 'parse_processes', 0)) as parse:
+        for record in imap_bounded(
+                partial(fetch_pep_row, session, engine=engine, parse=parse),
+                [row for row in rows if row[1] not in fetched],
+                getattr(cli_args, 'workers', DEFAULT_WORKERS),
+                max_memory=max_memory_bytes(cli_args)):
+            fetched[record.link] = record
+            if record.error is None:
+                journal.add(record.link, {
+                    'letter': record.letter,
+                    'status': record.status,
+                    'validators': record.validators,
+                })
+    return fetched
+
+
+def crawl_pep_records(session, rows, cli_args=None):
+    from checkpoints import checkpoint
+    from pep_shards import SHARD_FILE
+
+    shard = getattr(cli_args, 'shard', None)
+    snapshot_path = BASE_DIR / SNAPSHOTS_FOLDER / (
+        PEP_SNAPSHOT_FILE if shard is None else SHARD_FILE.format(*shard))
+    snapshot = load_snapshot(snapshot_path)
+    if getattr(cli_args, 'incremental', False):
+        to_fetch = [
+            (status_letter, pep_link) for status_letter, pep_link in rows
+            if not is_fresh(snapshot.get(pep_link), status_letter,
+                            PEP_SNAPSHOT_MAX_AGE)
+        ]
+        logging.info(INCREMENTAL_TEXT.format(len(to_fetch), len(rows)))
+    else:
+        to_fetch = rows
+    with checkpoint(checkpoint_path(snapshot_path.stem),
+                    getattr(cli_args, 'resume', False)) as journal:
+        fetched = fetch_pep_records(session, to_fetch, cli_args, journal)
+    records = []
+    entries = []
+    for status_letter, pep_link in rows:
+        record = fetched.get(pep_link)
+        if record is None:
+            entry = snapshot[pep_link]
+            record = PepRecord(status_letter, pep_link, entry['status'],
+                               validators=entry['validators'])
+        elif record.error is None:
+            entry = make_entry(pep_link, status_letter, record.status,
+                               record.validators)
+        else:
+            entry = snapshot.get(pep_link)
+        records.append(record)
+        if entry is not None:
+            entries.append(entry)
+    save_snapshot(snapshot_path, entries)
+    return records
+
+
+def load_pep_statuses(session, location):
+    """Статусы PEP по номерам из JSON-индекса по адресу или пути."""
+    if urlsplit(location).scheme in ('http', 'https'):
+        content = get_response(session, location).content
+    else:
+        content = Path(location).read_bytes()
+    return {
+        int(number): metadata['status']
+        for number, metadata in json.loads(content).items()
+    }
+
+
+def json_pep_records(rows, statuses):
+    for status_letter, pep_link in rows:
+        status_value = statuses.get(pep_number(pep_link))
+        if status_value is None:
+            yield PepRecord(status_letter, pep_link, error=PEP_JSON_MISSING)
+        else:
+            yield PepRecord(status_letter, pep_link, status_value)
+
+
+def cross_check_peps(session, records, sample_size, cli_args=None):
+    """Сверяет статусы из JSON со страницами случайной выборки PEP."""
+    candidates = [record for record in records if record.error is None]
+    sample = random.sample(candidates, min(sample_size, len(candidates)))
+    expected = {record.link: record.status for record in sample}
+    message = ''
+    mismatches = 0
+    for record in imap_bounded(
+            partial(fetch_pep_row, session,
+                    engine=getattr(cli_args, 'engine', ENGINE_BS4)),
+            [(record.letter, record.link) for record in sample],
+            getattr(cli_args, 'workers', DEFAULT_WORKERS)):
+        if record.error is not None:
+            logging.error(URL_ERROR_TEXT.format(record.link, record.error))
+        elif record.status != expected[record.link]:
+            mismatches += 1
+            message += CROSS_CHECK_BODY.format(
+                record.link, expected[record.link], record.status)
+    logging.info(CROSS_CHECK_HEAD.format(len(sample), mismatches) + message)
+    return mismatches
+
+
+def collect_pep_records(session, rows, cli_args=None):
+    pep_json = getattr(cli_args, 'pep_json', None)
+    if pep_json is None:
+        return crawl_pep_records(session, rows, cli_args)
+    records = list(
+        json_pep_records(rows, load_pep_statuses(session, pep_json)))
+    sample_size = getattr(cli_args, 'cross_check', None)
+    if sample_size:
+        cross_check_peps(session, records, sample_size, cli_args)
+    return records
+
+
+def pep(session, cli_args=None):
+    from pep_shards import SHARD_FILE, save_shard, shard_indexes
+
+    rows = get_pep_rows(session)
+    shard = getattr(cli_args, 'shard', None)
+    if shard is None:
+        return build_pep_report(
+            collect_pep_records(session, rows, cli_args), cli_args)
+    indexes = shard_indexes(len(rows), *shard)
+    records = collect_pep_records(
+        session, [rows[index] for index in indexes], cli_args)
+    shard_path = BASE_DIR / SHARDS_FOLDER / SHARD_FILE.format(*shard)
+    save_shard(shard_path, *shard, rows, zip(indexes, records))
+    logging.info(SHARD_SAVED.format(shard_path))
+    return build_pep_report(records, cli_args)
+
+
+def merge(session, cli_args=None):
+    """Собирает части pep --shard в отчёт, как при запуске на одном узле."""
+    from pep_shards import load_shards
+
+    return build_pep_report(load_shards(
+        BASE_DIR / SHARDS_FOLDER, getattr(cli_args, 'shards', None)),
+        cli_args)
 
 
 MODE_TO_FUNCTION = {
@@ -158,20 +512,193 @@ MODE_TO_FUNCTION = {
 }
 
 
+def cache_stats(session, cli_args=None):
+    totals = CacheStats.load(BASE_DIR / CACHE_STATS_FILE)
+    lookups = totals['hits'] + totals['misses']
+    return [
+        CacheStatRow.HEADER,
+        CacheStatRow(
+            'Хранилище', getattr(cli_args, 'cache_backend', CACHE_SQLITE)),
+        CacheStatRow('Записей', len(session.cache.responses)),
+        CacheStatRow('Байт', cache_size(session.cache)),
+        CacheStatRow('Попаданий', totals['hits']),
+        CacheStatRow('Промахов', totals['misses']),
+        CacheStatRow(
+            'Доля попаданий',
+            round(totals['hits'] / lookups, 4) if lookups else 0),
+    ]
+
+
+SERVICE_MODES = {
+    MODE_CACHE_STATS: cache_stats,
+    MODE_MERGE: merge,
+}
+
+
+def run_mode(session, cli_args):
+    mode_function = (
+        MODE_TO_FUNCTION.get(cli_args.mode) or SERVICE_MODES[cli_args.mode])
+    return mode_function(session, cli_args)
+
+
+def maintain_cache(session, cli_args):
+    """Сохраняет счётчики попаданий и ограничивает размер кеша."""
+    CACHE_STATS.save(BASE_DIR / CACHE_STATS_FILE)
+    max_size = getattr(cli_args, 'cache_max_size', CACHE_MAX_SIZE_MB)
+    evicted = prune_cache(session.cache, max_size * MEGABYTE)
+    if evicted:
+        logging.info(CACHE_EVICTED.format(evicted))
+
+
+def output_mode(results, cli_args):
+    if results is not None:
+        with stage('control_output'):
+            control_output(results, cli_args)
+
+
+def get_mode_args(args):
+    modes = args.mode
+    if MODE_ALL in modes:
+        modes = MODE_TO_FUNCTION
+    return [
+        Namespace(**{**vars(args), 'mode': mode})
+        for mode in dict.fromkeys(modes)
+    ]
+
+
+def run_modes(session, args, output=output_mode):
+    """Запускает выбранные режимы в одном процессе.
+
+    Несколько режимов выполняются параллельно на общей сессии и общем
+    PageCache, вывод каждого режима идёт в порядке их перечисления.
+    PageCache хранит только индексные страницы из get_soup и снимается
+    с сессии по окончании запуска. Потоковые результаты (--stream)
+    собираются в потоке режима: иначе обход шёл бы уже при выводе, после
+    предыдущих режимов, а не параллельно с ними. С -o sqlite все режимы
+    пишут под одним run_id в одной транзакции (output_run).
+    """
+    with output_run(args):
+        output_modes(session, args, output)
+
+
+def output_modes(session, args, output):
+    from concurrent.futures import ThreadPoolExecutor
+    mode_args = get_mode_args(args)
+    if len(mode_args) == 1:
+        output(run_mode(session, mode_args[0]), mode_args[0])
+        return
+    # В режиме с потолком памяти страницы не копятся на весь запуск.
+    session.page_cache = (
+        PageCache() if getattr(args, 'max_memory', None) is None else None)
+    try:
+        with ThreadPoolExecutor(max_workers=len(mode_args)) as executor:
+            futures = [
+                executor.submit(collect_mode, session, cli_args)
+                for cli_args in mode_args
+            ]
+            for cli_args, future in zip(mode_args, futures):
+                try:
+                    output(future.result(), cli_args)
+                except Exception as e:
+                    logging.exception(
+                        MODE_EXCEPTION_TEXT.format(cli_args.mode, e))
+    finally:
+        session.page_cache = None
+
+
+def collect_mode(session, cli_args):
+    results = run_mode(session, cli_args)
+    if results is None or isinstance(results, list):
+        return results
+    return list(results)
+
+
+class ChangedOutput:
+    """Вывод, пропускающий результаты, не изменившиеся с прошлого запуска.
+
+    В сравнение входят и сообщения отчёта (расхождения статусов, ошибки
+    загрузки): они журналируются вместе с изменившимся результатом.
+    """
+
+    def __init__(self):
+        self.digests = {}
+
+    def __call__(self, results, cli_args):
+        if results is None:
+            return
+        messages = getattr(results, 'messages', [])
+        results = list(results)
+        digest = hashlib.sha256(
+            repr((results, messages)).encode()).hexdigest()
+        if self.digests.get(cli_args.mode) == digest:
+            logging.info(WATCH_UNCHANGED.format(cli_args.mode))
+            return
+        self.digests[cli_args.mode] = digest
+        for level, message in messages:
+            logging.log(level, message)
+        output_mode(results, cli_args)
+
+
+def watch(session, args, stop):
+    """Перезапускает режимы каждые args.watch секунд до события stop.
+
+    Кэш перепроверяет каждую страницу условным запросом, поэтому
+    неизменившиеся страницы обходятся ответом 304.
+    """
+    session.settings.always_revalidate = True
+    output = ChangedOutput()
+    while not stop.is_set():
+        try:
+            run_modes(session, args, output)
+            maintain_cache(session, args)
+        except Exception as e:
+            logging.exception(EXCEPTION_TEXT.format(e))
+        stop.wait(args.watch)
+
+
+def handle_stop_signals(stop):
+    def handler(signum, frame):
+        logging.info(WATCH_STOP.format(signal.Signals(signum).name))
+        stop.set()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, handler)
+
+
 def main():
     try:
+        # Логирование и тяжёлые зависимости настраиваются только после
+        # разбора аргументов: -h и ошибки в аргументах обходятся без них.
+        arg_parser = configure_argument_parser(
+            (*MODE_TO_FUNCTION, MODE_ALL, *SERVICE_MODES))
+        args = arg_parser.parse_args()
         configure_logging()
         logging.info(PARSER_ON)
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
-        args = arg_parser.parse_args()
         logging.info(ARGUMENTS.format(args))
-        session = requests_cache.CachedSession()
+        if args.profile is not None:
+            PROFILER.enable()
+        session = configure_session(
+            connection_pool_size(args), args.retries, args.rate, args.burst,
+            cache_backend=args.cache_backend,
+            cache_max_size=args.cache_max_size * MEGABYTE)
         if args.clear_cache:
             session.cache.clear()
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results is not None:
-            control_output(results, args)
+        from replay import snapshot_session
+        with snapshot_session(
+                session, args.snapshot_read, args.snapshot_write):
+            if args.watch is None:
+                run_modes(session, args)
+                maintain_cache(session, args)
+            else:
+                stop = threading.Event()
+                handle_stop_signals(stop)
+                watch(session, args, stop)
+                session.close()
+        if args.max_memory is not None:
+            logging.info(PEAK_RSS_TEXT.format(peak_rss_bytes() // MEGABYTE))
+        if args.profile is not None:
+            PROFILER.dump(
+                None if args.profile == PROFILE_STDOUT else args.profile)
         logging.info(PARSER_OFF)
     except Exception as e:
         logging.exception(EXCEPTION_TEXT.format(e))
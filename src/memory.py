@@ -0,0 +1,41 @@
+"""Текущий и пиковый RSS процесса."""
+PROC_STATUS = '/proc/self/status'
+
+
+def read_status_bytes(field):
+    try:
+        with open(PROC_STATUS, encoding='ascii') as status:
+            for line in status:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_bytes():
+    """Текущий RSS или None, если система его не сообщает."""
+    return read_status_bytes('VmRSS:')
+
+
+def peak_rss_bytes():
+    """Пиковый RSS процесса.
+
+    VmHWM сбрасывается при exec, в отличие от ru_maxrss, который в Linux
+    наследуется от родительского процесса.
+    """
+    peak = read_status_bytes('VmHWM:')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def memory_exceeded(limit):
+    if limit is None:
+        return False
+    rss = current_rss_bytes()
+    return rss is not None and rss > limit
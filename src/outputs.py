@@ -1,44 +1,190 @@
 import csv
 import datetime as dt
+import json
 import logging
+from contextlib import closing, contextmanager
 
-from prettytable import PrettyTable
-
-from constants import BASE_DIR, DATETIME_FORMAT, OUTPUT_FILE, OUTPUT_PRETTY
+from constants import (BASE_DIR,
+                       DATETIME_FORMAT,
+                       OUTPUT_BATCH_SIZE,
+                       OUTPUT_FILE,
+                       OUTPUT_JSONL,
+                       OUTPUT_PRETTY,
+                       OUTPUT_SQLITE)
+from records import split_header
 
 
 FILE_OUTPUT = 'Файл с результатами был сохранён: {}'
 RESULTS_FOLDER = 'results'
+SQLITE_FILE = 'results.sqlite3'
+SQLITE_OUTPUT = 'Результаты запуска {} сохранены в базу: {}'
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, mode)
+);
+CREATE INDEX IF NOT EXISTS runs_mode ON runs (mode, run_id);
+"""
 
 
 def default_output(results, cli_args):
-    for row in results:
-        print(*row)
+    header, rows = split_header(results)
+    print(*header)
+    for number, row in enumerate(rows, start=1):
+        print(*row, flush=number % OUTPUT_BATCH_SIZE == 0)
 
 
 def pretty_output(results, cli_args):
+    from prettytable import PrettyTable
+    header, rows = split_header(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = header
     table.align = 'l'
-    table.add_rows(results[1:])
+    for row in rows:
+        table.add_row(row)
     print(table)
 
 
-def file_output(results, cli_args):
+def get_file_path(cli_args, extension):
     RESULTS_DIR = BASE_DIR / RESULTS_FOLDER
     RESULTS_DIR.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
     now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = RESULTS_DIR / file_name
+    file_name = f'{parser_mode}_{now_formatted}.{extension}'
+    return RESULTS_DIR / file_name
+
+
+def file_output(results, cli_args):
+    file_path = get_file_path(cli_args, 'csv')
     with open(file_path, 'w', encoding='utf-8') as f:
-        csv.writer(f, dialect=csv.unix_dialect).writerows(results)
+        writer = csv.writer(f, dialect=csv.unix_dialect)
+        header, rows = split_header(results)
+        writer.writerow(header)
+        for number, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if number % OUTPUT_BATCH_SIZE == 0:
+                f.flush()
     logging.info(FILE_OUTPUT.format(file_path))
 
 
+def jsonl_output(results, cli_args):
+    header, rows = split_header(results)
+    file_path = get_file_path(cli_args, 'jsonl')
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for number, row in enumerate(rows, start=1):
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write('\n')
+            if number % OUTPUT_BATCH_SIZE == 0:
+                f.flush()
+    logging.info(FILE_OUTPUT.format(file_path))
+
+
+def create_mode_table(connection, table, header):
+    columns = ''.join(f', "{name}"' for name in header)
+    connection.execute(
+        f'CREATE TABLE IF NOT EXISTS "{table}" '
+        f'(run_id INTEGER NOT NULL, '
+        f'row_number INTEGER NOT NULL{columns}, '
+        f'PRIMARY KEY (run_id, row_number))'
+    )
+
+
+class SqliteRun:
+    """Открытая транзакция и номер запуска, общие для всех его режимов."""
+
+    def __init__(self, connection, run_id, db_path):
+        self.connection = connection
+        self.run_id = run_id
+        self.db_path = db_path
+
+
+@contextmanager
+def sqlite_run():
+    """Открывает транзакцию запуска и выдаёт ему следующий run_id.
+
+    Транзакция фиксируется при выходе из блока, так что строки всех
+    режимов запуска появляются в базе вместе.
+    """
+    import sqlite3
+    RESULTS_DIR = BASE_DIR / RESULTS_FOLDER
+    RESULTS_DIR.mkdir(exist_ok=True)
+    db_path = RESULTS_DIR / SQLITE_FILE
+    with closing(sqlite3.connect(db_path, isolation_level=None)) as connection:
+        connection.executescript(SQLITE_SCHEMA)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            run_id, = connection.execute(
+                'SELECT COALESCE(MAX(run_id), 0) + 1 FROM runs').fetchone()
+            yield SqliteRun(connection, run_id, db_path)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+
+@contextmanager
+def output_run(cli_args):
+    """Один run_id и одна транзакция на все режимы запуска с -o sqlite."""
+    if getattr(cli_args, 'output', None) != OUTPUT_SQLITE:
+        yield
+        return
+    with sqlite_run() as run:
+        cli_args.sqlite_run = run
+        try:
+            yield
+        finally:
+            del cli_args.sqlite_run
+
+
+def write_sqlite_rows(run, results, cli_args):
+    header, rows = split_header(results)
+    table = cli_args.mode.replace('-', '_')
+    placeholders = ', '.join('?' * (len(header) + 2))
+    connection = run.connection
+    # Сбой одного режима откатывает только его строки.
+    connection.execute('SAVEPOINT mode_rows')
+    try:
+        create_mode_table(connection, table, header)
+        connection.execute(
+            'INSERT INTO runs (run_id, mode, started_at) VALUES (?, ?, ?)',
+            (run.run_id, cli_args.mode, dt.datetime.now().isoformat()),
+        )
+        connection.executemany(
+            f'INSERT INTO "{table}" VALUES ({placeholders})',
+            (
+                (run.run_id, number, *row)
+                for number, row in enumerate(rows, start=1)
+            ),
+        )
+    except BaseException:
+        connection.execute('ROLLBACK TO mode_rows')
+        connection.execute('RELEASE mode_rows')
+        raise
+    connection.execute('RELEASE mode_rows')
+    logging.info(SQLITE_OUTPUT.format(run.run_id, run.db_path))
+
+
+def sqlite_output(results, cli_args):
+    """Записывает строки режима в таблицу режима под run_id запуска.
+
+    Для каждого режима заводится своя таблица с колонками из заголовка.
+    Внутри run_modes все режимы пишут в общую транзакцию output_run,
+    отдельный вызов открывает собственную.
+    """
+    run = getattr(cli_args, 'sqlite_run', None)
+    if run is not None:
+        return write_sqlite_rows(run, results, cli_args)
+    with sqlite_run() as run:
+        write_sqlite_rows(run, results, cli_args)
+
+
 OUTPUTS = {
     OUTPUT_PRETTY: pretty_output,
     OUTPUT_FILE: file_output,
+    OUTPUT_JSONL: jsonl_output,
+    OUTPUT_SQLITE: sqlite_output,
     None: default_output
 }
 
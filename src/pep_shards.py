@@ -0,0 +1,78 @@
+"""Разбиение строк индекса PEP между узлами и сборка результатов."""
+import hashlib
+import json
+
+from records import PepRecord
+
+SHARD_FILE = 'pep-{}-of-{}.json'
+SHARD_PATTERN = 'pep-*-of-*.json'
+SHARDS_INCOMPLETE = 'Не хватает частей {} из {} для сборки PEP'
+SHARDS_MISMATCH = 'Части собраны по разным индексам PEP: {}'
+SHARDS_AMBIGUOUS = (
+    'В {} лежат части разных разбиений {}: укажите нужное через --shards'
+)
+SHARDS_NOT_FOUND = 'Не найдено ни одной части результатов PEP в {}'
+
+
+def shard_indexes(total, shard, shards):
+    """Номера строк индекса, которые обрабатывает часть shard из shards."""
+    return range(shard - 1, total, shards)
+
+
+def index_digest(rows):
+    """Отпечаток индекса PEP: части одного запуска совпадают по нему."""
+    return hashlib.sha256(
+        json.dumps(rows, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def save_shard(path, shard, shards, rows, indexed_records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({
+            'shard': shard,
+            'shards': shards,
+            'rows': len(rows),
+            'index': index_digest(rows),
+            'records': [
+                [index, record.letter, record.link, record.status,
+                 None if record.error is None else str(record.error)]
+                for index, record in indexed_records
+            ],
+        }, file, ensure_ascii=False, indent=1)
+    temp_path.replace(path)
+
+
+def load_shards(directory, shards=None):
+    """Собирает записи всех частей в порядке строк индекса.
+
+    shards - число частей разбиения; без него в каталоге должны лежать
+    части только одного разбиения. Части с другим индексом PEP не
+    смешиваются, а отвергаются. Ошибки загрузки восстанавливаются
+    строками: в отчёт они попадают через str(), как и исходные исключения.
+    """
+    paths = sorted(directory.glob(
+        SHARD_PATTERN if shards is None else SHARD_FILE.format('*', shards)))
+    if not paths:
+        raise FileNotFoundError(SHARDS_NOT_FOUND.format(directory))
+    parts = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            part = json.load(file)
+        parts.setdefault(part['shards'], {})[part['shard']] = part
+    if len(parts) > 1:
+        raise ValueError(SHARDS_AMBIGUOUS.format(directory, sorted(parts)))
+    (shards, parts), = parts.items()
+    layouts = {(part['rows'], part.get('index')) for part in parts.values()}
+    if len(layouts) > 1:
+        raise ValueError(SHARDS_MISMATCH.format(sorted(
+            path.name for path in paths)))
+    missing = sorted(set(range(1, shards + 1)) - set(parts))
+    if missing:
+        raise ValueError(SHARDS_INCOMPLETE.format(missing, shards))
+    indexed = sorted(
+        (index, PepRecord(letter, link, status, error))
+        for part in parts.values()
+        for index, letter, link, status, error in part['records']
+    )
+    return [record for _, record in indexed]
@@ -0,0 +1,54 @@
+import datetime as dt
+import json
+import re
+
+PEP_NUMBER_PATTERN = re.compile(r'pep-(?P<number>\d+)')
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def pep_number(pep_link):
+    match = PEP_NUMBER_PATTERN.search(pep_link)
+    return int(match.group('number')) if match else None
+
+
+def get_validators(headers):
+    return {
+        name: headers[name] for name in VALIDATOR_HEADERS if name in headers
+    }
+
+
+def load_snapshot(path):
+    """Возвращает снимок {ссылка на PEP: запись} или пустой словарь."""
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return {entry['link']: entry for entry in json.load(file)}
+
+
+def save_snapshot(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(list(entries), file, ensure_ascii=False, indent=1)
+    temp_path.replace(path)
+
+
+def make_entry(pep_link, status_letter, status_value, validators, now=None):
+    now = now or dt.datetime.now(dt.timezone.utc)
+    return {
+        'number': pep_number(pep_link),
+        'link': pep_link,
+        'letter': status_letter,
+        'status': status_value,
+        'validators': validators,
+        'fetched_at': now.isoformat(),
+    }
+
+
+def is_fresh(entry, status_letter, max_age, now=None):
+    """Запись актуальна, если буква в индексе не менялась и не истёк срок."""
+    if entry is None or entry['letter'] != status_letter:
+        return False
+    now = now or dt.datetime.now(dt.timezone.utc)
+    fetched_at = dt.datetime.fromisoformat(entry['fetched_at'])
+    return now - fetched_at < max_age
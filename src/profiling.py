@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from memory import peak_rss_bytes
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, rank):
+    index = max(0, -(-len(sorted_values) * rank // 100) - 1)
+    return sorted_values[index]
+
+
+class Profiler:
+    """Собирает длительности этапов и статистику ответов.
+
+    Пока профилировщик выключен, stage() и record_response() ничего
+    не делают, так что замеры не мешают обычным запускам.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.timings = defaultdict(list)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_transferred = 0
+
+    def enable(self):
+        self.reset()
+        self.enabled = True
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.timings[name].append(elapsed)
+
+    def record_response(self, response):
+        if not self.enabled:
+            return
+        from_cache = getattr(response, 'from_cache', False)
+        with self.lock:
+            if from_cache:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+                self.bytes_transferred += len(response.content)
+
+    def add_bytes(self, size):
+        if self.enabled:
+            with self.lock:
+                self.bytes_transferred += size
+
+    def report(self):
+        stages = {}
+        for name, values in sorted(self.timings.items()):
+            values = sorted(values)
+            stages[name] = {
+                'count': len(values),
+                'total': round(sum(values), 6),
+                **{
+                    f'p{rank}': round(percentile(values, rank), 6)
+                    for rank in PERCENTILES
+                },
+            }
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'stages': stages,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_ratio': (
+                round(self.cache_hits / lookups, 4) if lookups else None),
+            'bytes_transferred': self.bytes_transferred,
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+
+    def dump(self, path=None):
+        """Печатает отчёт в JSON или сохраняет его в path."""
+        report = json.dumps(self.report(), ensure_ascii=False, indent=2)
+        if path is None:
+            print(report)
+            return
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(report)
+
+
+PROFILER = Profiler()
+stage = PROFILER.stage
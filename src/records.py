@@ -0,0 +1,60 @@
+import sys
+from collections import namedtuple
+from itertools import chain
+
+
+def intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class WhatsNewRow(namedtuple('WhatsNewRow', ('link', 'title', 'editors'))):
+    __slots__ = ()
+    HEADER = ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+
+
+class VersionRow(namedtuple('VersionRow', ('link', 'version', 'status'))):
+    __slots__ = ()
+    HEADER = ('Ссылка на документацию', 'Версия', 'Статус')
+
+    def __new__(cls, link, version, status):
+        return super().__new__(cls, link, intern(version), intern(status))
+
+
+class StatusCountRow(namedtuple('StatusCountRow', ('status', 'count'))):
+    __slots__ = ()
+    HEADER = ('Статус', 'Количество')
+
+    def __new__(cls, status, count):
+        return super().__new__(cls, intern(status), count)
+
+
+class CacheStatRow(namedtuple('CacheStatRow', ('name', 'value'))):
+    __slots__ = ()
+    HEADER = ('Показатель', 'Значение')
+
+
+class PepRecord(namedtuple(
+        'PepRecord',
+        ('letter', 'link', 'status', 'error', 'validators'),
+        defaults=(None, None, None))):
+    """Результат обработки одной строки индекса PEP."""
+
+    __slots__ = ()
+
+    def __new__(cls, letter, link, status=None, error=None, validators=None):
+        return super().__new__(
+            cls, intern(letter), link, intern(status), error, validators)
+
+
+def split_header(results):
+    """Возвращает заголовок и итератор по строкам данных.
+
+    Заголовок берётся из HEADER типа строки, а если первая строка - обычный
+    кортеж, она сама считается заголовком.
+    """
+    rows = iter(results)
+    first = next(rows)
+    header = getattr(first, 'HEADER', None)
+    if header is None:
+        return first, rows
+    return header, chain((first,), rows)
@@ -0,0 +1,160 @@
+"""Запись ответов в единый архив снимка и воспроизведение из него.
+
+Формат архива: сигнатура, тела ответов подряд, JSON-индекс
+{url: [смещение, длина, статус, заголовки]} и в конце - смещение индекса
+и сигнатура. Чтение идёт через mmap: тело ответа - срез по смещению, без
+разбора остального архива.
+"""
+import json
+import mmap
+import shutil
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+MAGIC = b'BS4PSNAP'
+FOOTER = struct.Struct('<Q')
+# Тела в архиве уже распакованы, длину задаёт сам архив.
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+NOT_IN_SNAPSHOT = 'Адрес {} отсутствует в снимке {}'
+WRONG_SNAPSHOT = 'Файл {} не является снимком парсера'
+
+
+def clean_headers(headers):
+    return {
+        name: value for name, value in headers.items()
+        if name.lower() not in DROPPED_HEADERS
+    }
+
+
+class SnapshotWriter:
+    """Дописывает ответы в архив; для каждого адреса хранится первый."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.temp_path = self.path.with_name(self.path.name + '.tmp')
+        self.file = open(self.temp_path, 'wb')
+        self.file.write(MAGIC)
+        self.index = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def add(self, url, status, headers, body):
+        with self.lock:
+            if url in self.index:
+                return
+            self.index[url] = [
+                self.file.tell(), len(body), status, clean_headers(headers)]
+            self.file.write(body)
+
+    def add_response(self, url, response):
+        self.add(url, response.status_code, response.headers,
+                 response.content)
+
+    def add_file(self, url, status, headers, path):
+        with self.lock, open(path, 'rb') as source:
+            if url in self.index:
+                return
+            offset = self.file.tell()
+            shutil.copyfileobj(source, self.file)
+            self.index[url] = [offset, self.file.tell() - offset, status,
+                               clean_headers(headers)]
+
+    def close(self):
+        with self.lock:
+            index_offset = self.file.tell()
+            self.file.write(json.dumps(
+                self.index, ensure_ascii=False, sort_keys=True
+            ).encode('utf-8'))
+            self.file.write(FOOTER.pack(index_offset) + MAGIC)
+            self.file.close()
+        self.temp_path.replace(self.path)
+
+
+class SnapshotReader:
+    """Отдаёт ответы из архива без обращения к сети."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_offset = len(self.data) - FOOTER.size - len(MAGIC)
+        if (footer_offset < len(MAGIC)
+                or self.data[:len(MAGIC)] != MAGIC
+                or self.data[-len(MAGIC):] != MAGIC):
+            self.data.close()
+            raise ValueError(WRONG_SNAPSHOT.format(self.path))
+        index_offset, = FOOTER.unpack_from(self.data, footer_offset)
+        self.index = json.loads(self.data[index_offset:footer_offset])
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def response(self, url, request=None):
+        from requests.exceptions import ConnectionError
+        from requests.models import Response
+        from requests.structures import CaseInsensitiveDict
+        try:
+            offset, length, status, headers = self.index[url]
+        except KeyError:
+            raise ConnectionError(
+                NOT_IN_SNAPSHOT.format(url, self.path), request=request)
+        response = Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers['Content-Length'] = str(length)
+        with_body = request is None or request.method != 'HEAD'
+        response._content = (
+            self.data[offset:offset + length] if with_body else b'')
+        response._content_consumed = True
+        response.request = request
+        response.from_cache = True
+        return response
+
+    def close(self):
+        self.data.close()
+
+
+class ReplayAdapter:
+    """Транспорт сессии, который отвечает только из снимка."""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def send(self, request, **kwargs):
+        return self.reader.response(request.url, request)
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def snapshot_session(session, read_path=None, write_path=None):
+    """Подключает к сессии чтение или запись снимка на время блока.
+
+    При чтении HTTP-кеш отключается, а все запросы, включая скачивание
+    архивов, обслуживает ReplayAdapter: обращений к сети нет.
+    """
+    reader = writer = None
+    if read_path is not None:
+        reader = session.snapshot_reader = SnapshotReader(read_path)
+        adapter = ReplayAdapter(reader)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if hasattr(session, 'settings'):
+            session.settings.disabled = True
+    if write_path is not None:
+        writer = session.snapshot_writer = SnapshotWriter(write_path)
+    try:
+        yield session
+    finally:
+        if writer is not None:
+            del session.snapshot_writer
+            writer.close()
+        if reader is not None:
+            del session.snapshot_reader
+            reader.close()
@@ -0,0 +1,102 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+from constants import (DEFAULT_BURST,
+                       DEFAULT_RATE,
+                       LATENCY_SLOWDOWN,
+                       MIN_RATE_SHARE,
+                       THROTTLE_STATUSES)
+
+LATENCY_SMOOTHING = 0.2
+RATE_RECOVERY_SHARE = 0.05
+THROTTLED_RATE_FACTOR = 0.5
+SLOW_RATE_FACTOR = 0.8
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        # Токен резервируется сразу, даже в долг: ожидание идёт вне
+        # блокировки, а потоки обслуживаются в порядке обращения.
+        with self.lock:
+            self.refill(time.monotonic())
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+    def slow_down(self, factor):
+        with self.lock:
+            self.rate = max(self.max_rate * MIN_RATE_SHARE, self.rate * factor)
+
+    def speed_up(self):
+        with self.lock:
+            self.rate = min(
+                self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_SHARE)
+
+
+class HostScheduler:
+    """Ограничивает частоту запросов к каждому хосту.
+
+    Для хоста заводится свой TokenBucket. Ответы 429/503 и рост задержки
+    относительно лучшей наблюдаемой снижают скорость, успешные быстрые
+    ответы постепенно возвращают её к заданной. Задержки сравниваются
+    только у запросов одного вида (хост, метод, итоговый код): быстрые
+    HEAD и 304 не делают обычные GET медленными.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.latency = {}
+        self.best_latency = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+    def acquire(self, url):
+        self.bucket(urlsplit(url).netloc).acquire()
+
+    def is_slow(self, kind, latency):
+        with self.lock:
+            average = self.latency.get(kind, latency)
+            average += (latency - average) * LATENCY_SMOOTHING
+            self.latency[kind] = average
+            best = min(self.best_latency.get(kind, latency), latency)
+            self.best_latency[kind] = best
+        return average > best * LATENCY_SLOWDOWN
+
+    def feedback(self, url, statuses, latency, method='GET'):
+        """statuses - коды всех попыток запроса, включая повторы.
+
+        Задержка запроса с повторами включает паузы между ними и не
+        говорит о скорости сервера, поэтому в сравнение не идёт.
+        """
+        host = urlsplit(url).netloc
+        bucket = self.bucket(host)
+        if any(status in THROTTLE_STATUSES for status in statuses):
+            bucket.slow_down(THROTTLED_RATE_FACTOR)
+        elif len(statuses) > 1:
+            return
+        elif self.is_slow((host, method, statuses[-1]), latency):
+            bucket.slow_down(SLOW_RATE_FACTOR)
+        else:
+            bucket.speed_up()
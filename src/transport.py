@@ -0,0 +1,141 @@
+import random
+import time
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from constants import (BACKOFF_FACTOR,
+                       CONNECT_TIMEOUT,
+                       DEFAULT_BURST,
+                       DEFAULT_RATE,
+                       DEFAULT_RETRIES,
+                       DEFAULT_WORKERS,
+                       READ_TIMEOUT,
+                       RETRY_STATUSES)
+from scheduler import HostScheduler
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class JitterRetry(Retry):
+    """Экспоненциальная задержка между повторами со случайной добавкой.
+
+    Retry-After в ответах 429/503 учитывается базовым классом. Повторы
+    выполняются внутри urllib3, минуя TransportAdapter.send, поэтому
+    перед каждым из них токен хоста берётся у scheduler здесь.
+    """
+
+    def __init__(self, *args, scheduler=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+        self.origin = None
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.scheduler = self.scheduler
+        retry.origin = self.origin
+        return retry
+
+    def increment(self, *args, _pool=None, **kwargs):
+        retry = super().increment(*args, _pool=_pool, **kwargs)
+        if _pool is not None:
+            retry.origin = pool_origin(_pool)
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.scheduler is not None and self.origin is not None:
+            self.scheduler.acquire(self.origin)
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff) if backoff else 0
+
+
+def pool_origin(pool):
+    """Адрес хоста пула в том же виде, что и в URL запроса."""
+    netloc = pool.host
+    if pool.port not in (None, DEFAULT_PORTS.get(pool.scheme)):
+        netloc = f'{netloc}:{pool.port}'
+    return f'{pool.scheme}://{netloc}/'
+
+
+def attempt_statuses(response):
+    """Коды всех попыток; у попыток с сетевой ошибкой кода нет (None)."""
+    retries = getattr(response.raw, 'retries', None)
+    history = retries.history if retries is not None else ()
+    return [attempt.status for attempt in history] + [response.status_code]
+
+
+class TransportAdapter(HTTPAdapter):
+    """Адаптер с таймаутами по умолчанию и планировщиком запросов.
+
+    Через адаптер проходят только сетевые запросы: ответы из кеша
+    сессии не расходуют лимит планировщика.
+    """
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 scheduler=None, **kwargs):
+        self.timeout = timeout
+        self.scheduler = scheduler
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if self.scheduler is None:
+            return super().send(
+                request, timeout=timeout or self.timeout, **kwargs)
+        self.scheduler.acquire(request.url)
+        start = time.monotonic()
+        response = super().send(
+            request, timeout=timeout or self.timeout, **kwargs)
+        self.scheduler.feedback(
+            request.url, attempt_statuses(response), time.monotonic() - start,
+            request.method)
+        return response
+
+
+def make_retry(retries=DEFAULT_RETRIES, scheduler=None):
+    return JitterRetry(
+        scheduler=scheduler,
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=('GET', 'HEAD'),
+        respect_retry_after_header=True,
+    )
+
+
+def mount_transport(session, pool_size=DEFAULT_WORKERS,
+                    retries=DEFAULT_RETRIES, rate=DEFAULT_RATE,
+                    burst=DEFAULT_BURST):
+    """Подключает к сессии пул соединений, повторы и ограничение частоты.
+
+    pool_size - сколько соединений с одним хостом держать открытыми, то
+    есть наибольшее число одновременных запросов к нему. При rate=None
+    частота запросов не ограничивается.
+    """
+    scheduler = HostScheduler(rate, burst) if rate else None
+    adapter = TransportAdapter(
+        scheduler=scheduler,
+        pool_maxsize=pool_size,
+        max_retries=make_retry(retries, scheduler),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def uncached_session(session):
+    """Сессия без HTTP-кеша с теми же транспортами, что у session.
+
+    Нужна для больших файлов: кеш общей сессии не отключается, поэтому
+    режимы, работающие параллельно, продолжают им пользоваться.
+    """
+    plain = Session()
+    for prefix, adapter in session.adapters.items():
+        plain.mount(prefix, adapter)
+    return plain
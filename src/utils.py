@@ -1,21 +1,273 @@
-from bs4 import BeautifulSoup
-from requests.exceptions import RequestException
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
 
-from exceptions import ParserFindTagException
+from cache import CACHE_STATS
+from constants import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_SEGMENT_MIN_SIZE
+from exceptions import DownloadVerificationError, ParserFindTagException
+from memory import memory_exceeded
+from profiling import PROFILER, stage
 
 ERROR_MESSAGE = 'Не найден тег {} {}'
 ERROR_TEXT = 'Возникла ошибка при загрузке страницы {}: {}'
+PARTIAL_SUFFIX = '.part'
+SEGMENTS_SUFFIX = '.segments'
+VALIDATOR_SUFFIX = '.etag'
+SEGMENT_ERROR = 'Сервер не отдал диапазон байт {}-{}'
+SIZE_MISMATCH = 'Размер {} не совпадает: {} вместо {} байт'
+BROKEN_ARCHIVE = 'Архив {} повреждён: {}'
+ZIP_SUFFIXES = ('.zip', '.epub')
+TAR_SUFFIXES = ('.tar', '.tar.bz2', '.tar.gz', '.tar.xz')
+
+
+class PageCache:
+    """Деревья индексных страниц, общие для режимов одного запуска.
+
+    Каждый ключ загружается один раз: потоки, запросившие его во время
+    загрузки, ждут готового результата, а не повторяют запрос.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+
+    def get(self, key, load):
+        from concurrent.futures import Future
+        with self.lock:
+            future = self.pages.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self.pages[key] = Future()
+        if is_owner:
+            try:
+                future.set_result(load())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
 
 
 def get_response(session, url, encoding='utf-8'):
+    from requests.exceptions import RequestException
+    reader = getattr(session, 'snapshot_reader', None)
+    writer = getattr(session, 'snapshot_writer', None)
     try:
-        response = session.get(url)
+        with stage('get_response'):
+            if reader is not None:
+                response = reader.response(url)
+            else:
+                response = session.get(url)
         response.encoding = encoding
+        PROFILER.record_response(response)
+        if reader is None:
+            CACHE_STATS.record(response)
+        if writer is not None:
+            writer.add_response(url, response)
         return response
     except RequestException as e:
         raise ConnectionError(ERROR_TEXT.format(url, e))
 
 
+def is_downloaded(path, size, validator):
+    validator_path = path.with_name(path.name + VALIDATOR_SUFFIX)
+    return (
+        size is not None
+        and validator is not None
+        and path.exists()
+        and validator_path.exists()
+        and path.stat().st_size == int(size)
+        and validator_path.read_text(encoding='utf-8') == validator
+    )
+
+
+def download_file(session, url, path, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                  segments=1):
+    """Потоково скачивает url в path через транспорт сессии, минуя её кеш.
+
+    Недокачанный файл хранится рядом с суффиксом .part и докачивается через
+    Range, если сервер отдаёт ETag или Last-Modified. При segments > 1
+    большой файл скачивается параллельными диапазонами в отдельный файл,
+    который становится .part только после загрузки всех диапазонов.
+    Готовый файл проверяется verify_archive. Возвращает False, если
+    локальный файл совпадает с удалённым по размеру и валидатору.
+    """
+    from requests.exceptions import RequestException
+
+    from transport import uncached_session
+    files = uncached_session(session)
+    partial_path = path.with_name(path.name + PARTIAL_SUFFIX)
+    try:
+        head = files.head(url, allow_redirects=True)
+        size = head.headers.get('Content-Length')
+        validator = (head.headers.get('ETag')
+                     or head.headers.get('Last-Modified'))
+        if is_downloaded(path, size, validator):
+            record_file(session, url, head.headers, path)
+            return False
+        segments = segment_count(head.headers, validator, segments)
+        if segments > 1:
+            download_segments(files, url, partial_path, validator,
+                              int(size), segments, chunk_size)
+        else:
+            stream_to_file(files, url, partial_path, validator, size,
+                           chunk_size)
+    except RequestException as e:
+        raise ConnectionError(ERROR_TEXT.format(url, e))
+    try:
+        verify_archive(partial_path, size, path.name)
+    except DownloadVerificationError:
+        partial_path.unlink()
+        raise
+    partial_path.replace(path)
+    if validator is not None:
+        path.with_name(path.name + VALIDATOR_SUFFIX).write_text(
+            validator, encoding='utf-8')
+    record_file(session, url, head.headers, path)
+    return True
+
+
+def stream_to_file(session, url, partial_path, validator, size=None,
+                   chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Скачивает url в partial_path, докачивая его через Range.
+
+    Уже полный .part (процесс прервали перед переименованием) не
+    запрашивается, а сразу уходит на проверку. Если сервер не может отдать
+    остаток (416), .part удаляется и файл скачивается заново.
+    """
+    from requests.exceptions import RequestException
+    offset = 0
+    if validator is not None and partial_path.exists():
+        offset = partial_path.stat().st_size
+    if offset and size is not None and offset == int(size):
+        return
+    headers = {}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        headers['If-Range'] = validator
+    with session.get(url, headers=headers, stream=True) as response:
+        if offset and response.status_code == 416:
+            partial_path.unlink()
+            return stream_to_file(session, url, partial_path, validator,
+                                  size, chunk_size)
+        response.raise_for_status()
+        if (response.status_code == 206 and not response.headers.get(
+                'Content-Range', '').startswith(f'bytes {offset}-')):
+            raise RequestException(SEGMENT_ERROR.format(offset, ''))
+        mode = 'ab' if response.status_code == 206 else 'wb'
+        with open(partial_path, mode) as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+                PROFILER.add_bytes(len(chunk))
+
+
+def segment_count(headers, validator, segments):
+    """Сколько диапазонов использовать: каждый не меньше минимального."""
+    size = headers.get('Content-Length')
+    if (segments <= 1 or validator is None or size is None
+            or headers.get('Accept-Ranges') != 'bytes'):
+        return 1
+    return max(1, min(segments, int(size) // DOWNLOAD_SEGMENT_MIN_SIZE))
+
+
+def segment_ranges(size, segments):
+    step = -(-size // segments)
+    return [
+        (start, min(start + step, size) - 1)
+        for start in range(0, size, step)
+    ]
+
+
+def download_segments(session, url, partial_path, validator, size, segments,
+                      chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Скачивает диапазоны в заранее размеченный файл рядом с .part.
+
+    Размеченный файл сразу имеет полный размер, поэтому .part из него
+    получается только после успеха всех диапазонов: иначе следующий
+    запуск принял бы файл с пустыми участками за докачанный.
+    """
+    segments_path = partial_path.with_name(
+        partial_path.name + SEGMENTS_SUFFIX)
+    with open(segments_path, 'wb') as file:
+        file.truncate(size)
+    try:
+        for _ in imap_bounded(
+                partial(download_segment, session, url, segments_path,
+                        validator, chunk_size=chunk_size),
+                segment_ranges(size, segments),
+                segments):
+            pass
+    except BaseException:
+        segments_path.unlink()
+        raise
+    segments_path.replace(partial_path)
+
+
+def download_segment(session, url, partial_path, validator, byte_range,
+                     chunk_size=DOWNLOAD_CHUNK_SIZE):
+    from requests.exceptions import RequestException
+    start, end = byte_range
+    headers = {'Range': f'bytes={start}-{end}', 'If-Range': validator}
+    with session.get(url, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        content_range = response.headers.get('Content-Range', '')
+        if (response.status_code != 206
+                or not content_range.startswith(f'bytes {start}-{end}/')):
+            raise RequestException(SEGMENT_ERROR.format(start, end))
+        with open(partial_path, 'r+b') as file:
+            file.seek(start)
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+                PROFILER.add_bytes(len(chunk))
+            if file.tell() != end + 1:
+                raise RequestException(SEGMENT_ERROR.format(start, end))
+
+
+def verify_zip(path, name):
+    import zipfile
+    try:
+        with zipfile.ZipFile(path) as archive:
+            broken = archive.testzip()
+    except zipfile.BadZipFile as e:
+        raise DownloadVerificationError(BROKEN_ARCHIVE.format(name, e))
+    if broken is not None:
+        raise DownloadVerificationError(BROKEN_ARCHIVE.format(name, broken))
+
+
+def verify_tar(path, name):
+    import tarfile
+    try:
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                with archive.extractfile(member) as file:
+                    while file.read(DOWNLOAD_CHUNK_SIZE):
+                        pass
+    except (tarfile.TarError, EOFError, OSError) as e:
+        raise DownloadVerificationError(BROKEN_ARCHIVE.format(name, e))
+
+
+def verify_archive(path, size=None, name=None):
+    """Проверяет размер файла и целостность zip- и tar-архивов.
+
+    Тип архива определяется по имени name (по умолчанию - имя path).
+    """
+    name = name or path.name
+    if size is not None and path.stat().st_size != int(size):
+        raise DownloadVerificationError(
+            SIZE_MISMATCH.format(name, path.stat().st_size, size))
+    if name.endswith(ZIP_SUFFIXES):
+        verify_zip(path, name)
+    elif name.endswith(TAR_SUFFIXES):
+        verify_tar(path, name)
+
+
+def record_file(session, url, headers, path):
+    writer = getattr(session, 'snapshot_writer', None)
+    if writer is not None:
+        writer.add_file(url, 200, headers, path)
+
+
 def find_tag(soup, tag, attrs=None):
     searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
@@ -24,5 +276,88 @@ def find_tag(soup, tag, attrs=None):
     return searched_tag
 
 
-def get_soup(session, url, features='lxml'):
-    return BeautifulSoup(get_response(session, url).text, features=features)
+def get_strainer(parse_only):
+    from bs4 import SoupStrainer
+    if parse_only is None or isinstance(parse_only, SoupStrainer):
+        return parse_only
+    name, attrs = parse_only
+    return SoupStrainer(name, attrs or {})
+
+
+def make_soup(markup, features='lxml', parse_only=None):
+    """Строит дерево только из тегов, подходящих под parse_only.
+
+    parse_only - SoupStrainer или пара (имя тега, атрибуты).
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(
+        markup,
+        features=features,
+        parse_only=get_strainer(parse_only),
+        from_encoding='utf-8' if isinstance(markup, bytes) else None,
+    )
+
+
+def get_soup(session, url, features='lxml', parse_only=None):
+    page_cache = getattr(session, 'page_cache', None)
+    if page_cache is not None:
+        return page_cache.get(
+            ('soup', url, features, repr(parse_only)),
+            lambda: build_soup(session, url, features, parse_only))
+    return build_soup(session, url, features, parse_only)
+
+
+def build_soup(session, url, features='lxml', parse_only=None):
+    markup = get_response(session, url).text
+    with stage('get_soup'):
+        return make_soup(markup, features=features, parse_only=parse_only)
+
+
+def imap_bounded(func, items, workers=1, on_done=None, max_memory=None):
+    """Применяет func к items в пуле потоков, сохраняя порядок.
+
+    Одновременно в работе находится не более 2 * workers задач, результаты
+    отдаются строго в порядке items. on_done вызывается сразу по завершении
+    каждой задачи, не дожидаясь её очереди на выдачу. Пока RSS процесса
+    больше max_memory байт, новые задачи не ставятся, пока не будут выданы
+    уже начатые.
+    """
+    if workers <= 1:
+        for item in items:
+            result = func(item)
+            if on_done is not None:
+                on_done()
+            yield result
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            while pending and (len(pending) >= 2 * workers
+                               or memory_exceeded(max_memory)):
+                yield pending.popleft().result()
+            future = executor.submit(func, item)
+            if on_done is not None:
+                future.add_done_callback(lambda _: on_done())
+            pending.append(future)
+        while pending:
+            yield pending.popleft().result()
+
+
+def parse_inline(func, *args):
+    return func(*args)
+
+
+@contextmanager
+def parser_pool(processes=0):
+    """Отдаёт функцию parse(func, *args) для разбора страниц.
+
+    При processes > 0 разбор выполняется в пуле процессов: туда уходят
+    байты страницы, обратно возвращается только извлечённый результат.
+    """
+    if not processes:
+        yield parse_inline
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield lambda func, *args: executor.submit(func, *args).result()
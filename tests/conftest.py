@@ -31,6 +31,13 @@ def pytest_make_parametrize_id(config, val):
     return repr(val)
 
 
+@pytest.fixture
+def base_dir(monkeypatch, tmp_path):
+    """Каталоги результатов, снимков и частей создаются во временной папке."""
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    return Path(tmp_path)
+
+
 @pytest.fixture(scope='function')
 def tempfile_session() -> CachedSession:
     """Get a CachedSession using a temporary SQLite db"""
@@ -72,6 +79,49 @@ def mock_session(tempfile_session) -> CachedSession:
     yield mount_mock_adapter(tempfile_session)
 
 
+def get_site_adapter() -> Adapter:
+    from tests.fixture_data import pages
+    adapter = Adapter()
+    adapter.register_uri(
+        'GET', pages.WHATS_NEW_URL, text=pages.whats_new_index())
+    for version in pages.WHATS_NEW_VERSIONS:
+        adapter.register_uri(
+            'GET',
+            f'{pages.WHATS_NEW_URL}{version}.html',
+            text=pages.whats_new_page(version),
+        )
+    adapter.register_uri(
+        'GET', pages.DOWNLOAD_URL, text=pages.DOWNLOAD_PAGE)
+    for url, content, etag in (
+            (pages.ARCHIVE_URL, pages.ARCHIVE_CONTENT, pages.ARCHIVE_ETAG),
+            (pages.TAR_ARCHIVE_URL, pages.TAR_ARCHIVE_CONTENT,
+             pages.TAR_ARCHIVE_ETAG)):
+        archive_headers = {
+            'Content-Length': str(len(content)),
+            'ETag': etag,
+        }
+        adapter.register_uri('HEAD', url, headers=archive_headers)
+        adapter.register_uri(
+            'GET', url, headers=archive_headers, content=content)
+    adapter.register_uri('GET', pages.MAIN_PEP_URL, text=pages.pep_index())
+    adapter.register_uri('GET', pages.PEP_JSON_URL, text=pages.pep_json())
+    for number, _, _, status in pages.PEPS:
+        adapter.register_uri(
+            'GET',
+            pages.pep_url(number),
+            text=pages.pep_page(number, status),
+        )
+    return adapter
+
+
+@pytest.fixture(scope='function')
+def site_session(tempfile_session) -> CachedSession:
+    adapter = get_site_adapter()
+    tempfile_session.mount('https://', adapter)
+    tempfile_session.mock_adapter = adapter
+    yield tempfile_session
+
+
 @pytest.fixture
 def response_page(mock_session):
     def _response_page(page):
@@ -0,0 +1,129 @@
+MAIN_PEP_URL = 'https://peps.python.org/'
+
+PEP_INDEX_ROW = (
+    '<tr><td><abbr>{type}{letter}</abbr></td>'
+    '<td><a href="pep-{number:04d}/">{number}</a></td>'
+    '<td><a href="pep-{number:04d}/">PEP {number}</a></td></tr>'
+)
+PEP_INDEX = (
+    '<html><body><section id="numerical-index">'
+    '<table class="pep-zero-table docutils align-default"><tbody>'
+    '{rows}</tbody></table></section></body></html>'
+)
+PEP_PAGE = (
+    '<html><body><section id="pep-content"><h1>PEP {number}</h1>'
+    '<dl class="rfc2822 field-list simple">'
+    '<dt class="field-odd">Author<span class="colon">:</span></dt>'
+    '<dd class="field-odd">Guido</dd>'
+    '<dt class="field-even">Status<span class="colon">:</span></dt>'
+    '<dd class="field-even"><abbr>{status}</abbr></dd>'
+    '</dl><p>Body</p></section></body></html>'
+)
+
+PEPS = (
+    (1, 'P', 'A', 'Active'),
+    (8, 'P', 'A', 'Active'),
+    (100, 'S', 'F', 'Final'),
+    (201, 'S', 'R', 'Withdrawn'),
+    (202, 'S', 'F', 'Final'),
+    (3000, 'P', 'W', 'Withdrawn'),
+    (3001, 'S', '', 'Draft'),
+)
+
+
+def pep_url(number):
+    return f'{MAIN_PEP_URL}pep-{number:04d}/'
+
+
+def pep_index(peps=PEPS):
+    return PEP_INDEX.format(rows=''.join(
+        PEP_INDEX_ROW.format(type=type_, letter=letter, number=number)
+        for number, type_, letter, _ in peps
+    ))
+
+
+def pep_page(number, status):
+    return PEP_PAGE.format(number=number, status=status)
+
+
+PEP_JSON_URL = f'{MAIN_PEP_URL}api/peps.json'
+
+
+def pep_json(peps=PEPS):
+    import json
+    return json.dumps({
+        str(number): {
+            'number': number,
+            'title': f'PEP {number}',
+            'status': status,
+            'url': pep_url(number),
+        }
+        for number, _, _, status in peps
+    })
+
+
+WHATS_NEW_URL = 'https://docs.python.org/3/whatsnew/'
+
+WHATS_NEW_INDEX = (
+    '<html><body><section id="what-s-new-in-python">'
+    '<div class="toctree-wrapper compound"><ul>{items}</ul></div>'
+    '</section></body></html>'
+)
+WHATS_NEW_ITEM = '<li class="toctree-l1"><a href="{version}.html">{version}</a></li>'
+WHATS_NEW_PAGE = (
+    '<html><body><section><h1>What’s New In Python {version}</h1>'
+    '<dl class="field-list simple"><dt>Editor</dt>\n<dd>Editor {version}</dd>'
+    '</dl></section></body></html>'
+)
+WHATS_NEW_VERSIONS = ('3.12', '3.11', '3.10', '3.9', '3.8')
+
+
+def whats_new_index(versions=WHATS_NEW_VERSIONS):
+    return WHATS_NEW_INDEX.format(items=''.join(
+        WHATS_NEW_ITEM.format(version=version) for version in versions
+    ))
+
+
+def whats_new_page(version):
+    return WHATS_NEW_PAGE.format(version=version)
+
+
+def make_zip(payload):
+    import io
+    import zipfile
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(
+            zipfile.ZipInfo('docs.pdf', date_time=(2023, 10, 2, 0, 0, 0)),
+            payload)
+    return buffer.getvalue()
+
+
+def make_tar(payload):
+    import io
+    import tarfile
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:bz2') as archive:
+        info = tarfile.TarInfo('docs/index.html')
+        info.size = len(payload)
+        archive.addfile(info, io.BytesIO(payload))
+    return buffer.getvalue()
+
+
+DOWNLOAD_URL = 'https://docs.python.org/3/download.html'
+ARCHIVE_URL = 'https://docs.python.org/3/archives/python-3.12.0-docs-pdf-a4.zip'
+ARCHIVE_CONTENT = make_zip(bytes(range(256)) * 64)
+ARCHIVE_ETAG = '"archive-v1"'
+TAR_ARCHIVE_URL = (
+    'https://docs.python.org/3/archives/python-3.12.0-docs-html.tar.bz2')
+TAR_ARCHIVE_CONTENT = make_tar(b'<html>docs</html>' * 512)
+TAR_ARCHIVE_ETAG = '"tar-v1"'
+
+DOWNLOAD_PAGE = (
+    '<html><body><div role="main"><table class="docutils">'
+    '<tr><td>PDF (A4)</td>'
+    '<td><a href="archives/python-3.12.0-docs-pdf-a4.zip">Download</a></td>'
+    '</tr><tr><td>HTML</td>'
+    '<td><a href="archives/python-3.12.0-docs-html.tar.bz2">Download</a></td>'
+    '</tr></table></div></body></html>'
+)
@@ -0,0 +1,85 @@
+from argparse import Namespace
+from datetime import timedelta
+
+import pytest
+import requests_mock
+
+import cache
+from src import configs, main
+
+PAGE_URL = 'https://peps.python.org/pep-{:04d}/'
+PAGE = b'<html>' + b'<p>PEP body</p>' * 4096 + b'</html>'
+
+
+def fill(session, count):
+    adapter = requests_mock.Adapter()
+    for number in range(count):
+        adapter.register_uri('GET', PAGE_URL.format(number), content=PAGE)
+    session.mount('https://', adapter)
+    for number in range(count):
+        session.get(PAGE_URL.format(number))
+
+
+@pytest.fixture
+def sqlite_session(tmp_path):
+    session = configs.configure_session(cache_name=tmp_path / 'http_cache')
+    yield session
+    session.close()
+
+
+def test_sqlite_backend_uses_wal_and_compression(sqlite_session):
+    fill(sqlite_session, 1)
+    responses = sqlite_session.cache.responses
+    with responses.connection() as connection:
+        journal_mode, = connection.execute('PRAGMA journal_mode').fetchone()
+        stored, = connection.execute(
+            f'SELECT LENGTH(value) FROM {responses.table_name}').fetchone()
+    assert journal_mode == 'wal'
+    assert stored < len(PAGE) / 10
+    response = sqlite_session.get(PAGE_URL.format(0))
+    assert response.from_cache and response.content == PAGE
+
+
+@pytest.mark.parametrize('name', ['filesystem', 'memory'])
+def test_other_backends(tmp_path, name):
+    session = configs.configure_session(
+        cache_backend=name, cache_name=tmp_path / 'http_cache')
+    fill(session, 1)
+    assert session.get(PAGE_URL.format(0)).content == PAGE
+    assert len(session.cache.responses) == 1
+
+
+def test_prune_cache_evicts_oldest(sqlite_session):
+    sqlite_session.settings.urls_expire_after = {}
+    for number in range(6):
+        # Давние записи живут дольше: порядок вытеснения от срока не зависит.
+        sqlite_session.settings.expire_after = timedelta(days=6 - number)
+        fill(sqlite_session, number + 1)
+    before = cache.cache_size(sqlite_session.cache)
+    evicted = cache.prune_cache(sqlite_session.cache, before - 1)
+    assert evicted >= 1
+    assert cache.cache_size(sqlite_session.cache) < before
+    urls = sqlite_session.cache.urls()
+    assert PAGE_URL.format(0) not in urls
+    assert PAGE_URL.format(5) in urls
+    assert cache.prune_cache(sqlite_session.cache, None) == 0
+
+
+def test_cache_stats_accumulate_between_runs(base_dir, sqlite_session,
+                                             monkeypatch):
+    monkeypatch.setattr(main, 'CACHE_STATS', cache.CacheStats())
+    monkeypatch.setattr(
+        'utils.CACHE_STATS', main.CACHE_STATS)
+    main.CACHE_STATS.save(base_dir / 'http_cache_stats.json')
+    for _ in range(2):
+        fill(sqlite_session, 2)
+        main.maintain_cache(sqlite_session, Namespace(cache_max_size=256))
+    for _ in range(2):
+        main.get_response(sqlite_session, PAGE_URL.format(0))
+    main.maintain_cache(sqlite_session, Namespace(cache_max_size=256))
+    rows = dict(main.cache_stats(
+        sqlite_session, Namespace(cache_backend='sqlite'))[1:])
+    assert rows['Записей'] == 2
+    assert rows['Байт'] > 0
+    assert rows['Попаданий'] == 2
+    assert rows['Промахов'] == 0
@@ -0,0 +1,68 @@
+from argparse import Namespace
+
+import pytest
+
+from src import main
+from checkpoints import Checkpoint
+from tests.fixture_data import pages
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+def count_fetches(monkeypatch, name, fail_after=None):
+    fetch = getattr(main, name)
+    calls = []
+
+    def counted(session, item, **kwargs):
+        if fail_after is not None and len(calls) >= fail_after:
+            raise KeyboardInterrupt
+        calls.append(item)
+        return fetch(session, item, **kwargs)
+
+    monkeypatch.setattr(main, name, counted)
+    return calls
+
+
+def test_pep_resume_after_interrupt(site_session, monkeypatch, base_dir):
+    expected = main.pep(site_session, Namespace(workers=1))
+    assert not (base_dir / 'checkpoints' / 'pep.jsonl').exists()
+    with monkeypatch.context() as patch:
+        count_fetches(patch, 'fetch_pep_row', fail_after=4)
+        with pytest.raises(KeyboardInterrupt):
+            main.pep(site_session, Namespace(workers=1))
+    assert (base_dir / 'checkpoints' / 'pep.jsonl').exists()
+    calls = count_fetches(monkeypatch, 'fetch_pep_row')
+    assert main.pep(site_session, Namespace(workers=1, resume=True)) == (
+        expected)
+    assert len(calls) == len(pages.PEPS) - 4
+    assert not (base_dir / 'checkpoints' / 'pep.jsonl').exists()
+
+
+def test_whats_new_resume_after_interrupt(site_session, monkeypatch):
+    expected = main.whats_new(site_session, Namespace(workers=2))
+    stream = main.whats_new(site_session, Namespace(workers=1, stream=True))
+    next(stream), next(stream), next(stream)
+    stream.close()
+    calls = count_fetches(monkeypatch, 'fetch_whats_new_row')
+    got = main.whats_new(site_session, Namespace(workers=2, resume=True))
+    assert got == expected
+    assert len(calls) == len(pages.WHATS_NEW_VERSIONS) - 2
+
+
+def test_checkpoint_drops_torn_last_line(tmp_path):
+    path = tmp_path / 'pep.jsonl'
+    path.write_text('["a", 1]\n["b", 2]\n["c", ', encoding='utf-8')
+    journal = Checkpoint(path, resume=True)
+    assert journal.done == {'a': 1, 'b': 2}
+    journal.add('c', 3)
+    journal.close(finished=False)
+    assert Checkpoint(path, resume=True).done == {'a': 1, 'b': 2, 'c': 3}
+
+
+def test_without_resume_checkpoint_starts_over(tmp_path):
+    path = tmp_path / 'pep.jsonl'
+    path.write_text('["a", 1]\n', encoding='utf-8')
+    journal = Checkpoint(path)
+    assert journal.done == {}
+    journal.close(finished=True)
+    assert not path.exists()
@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'sqlite', 'jsonl'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +64,47 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_configure_session_expiry_per_url():
+    session = configs.configure_session(backend='memory')
+    expire_after = session.settings.urls_expire_after
+    assert list(expire_after)[0] == 'peps.python.org/pep-', (
+        'Шаблон для страниц PEP должен проверяться раньше общего'
+    )
+    assert expire_after['peps.python.org/pep-'] > (
+        expire_after['peps.python.org']
+    )
+
+
+def test_configure_session_revalidates_expired_pages():
+    import requests_mock
+    url = 'https://peps.python.org/pep-0008/'
+    session = configs.configure_session(backend='memory')
+    session.settings.urls_expire_after = {'peps.python.org': 0}
+
+    def conditional(request, context):
+        if request.headers.get('If-None-Match') == '"v1"':
+            context.status_code = 304
+            return b''
+        context.headers['ETag'] = '"v1"'
+        return b'PEP 8'
+
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', url, content=conditional)
+    session.mount('https://', adapter)
+    session.get(url)
+    response = session.get(url)
+    assert adapter.call_count == 2
+    assert adapter.last_request.headers['If-None-Match'] == '"v1"'
+    assert response.content == b'PEP 8'
+
+
+@pytest.mark.parametrize('option', ['--parse-processes', '--retries'])
+@pytest.mark.parametrize('value', ['-2', 'x'])
+def test_count_options_reject_invalid(option, value):
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', option, value])
+    args = parser.parse_args(['pep', option, '0'])
+    assert getattr(args, option[2:].replace('-', '_')) == 0
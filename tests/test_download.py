@@ -0,0 +1,173 @@
+from argparse import Namespace
+
+import utils
+from src import main
+from tests.fixture_data import pages
+
+
+def archive_path(base_dir):
+    return base_dir / 'downloads' / pages.ARCHIVE_URL.split('/')[-1]
+
+
+def test_download_streams_archive(base_dir, site_session):
+    assert main.download(site_session) is None
+    assert archive_path(base_dir).read_bytes() == pages.ARCHIVE_CONTENT
+    assert not site_session.cache.contains(url=pages.ARCHIVE_URL), (
+        'Архив не должен сохраняться в кеш сессии'
+    )
+
+
+def test_download_skips_unchanged_archive(base_dir, site_session, caplog):
+    caplog.set_level('INFO')
+    main.download(site_session)
+    adapter = site_session.mock_adapter
+    calls_before = adapter.call_count
+    main.download(site_session)
+    archive_gets = [
+        request for request in adapter.request_history[calls_before:]
+        if request.method == 'GET' and request.url == pages.ARCHIVE_URL
+    ]
+    assert not archive_gets, 'Неизменившийся архив не должен скачиваться'
+    assert 'загрузка пропущена' in caplog.text
+
+
+def test_download_resumes_partial_file(base_dir, site_session):
+    path = archive_path(base_dir)
+    path.parent.mkdir()
+    offset = 1000
+    path.with_name(path.name + '.part').write_bytes(
+        pages.ARCHIVE_CONTENT[:offset])
+
+    def ranged(request, context):
+        assert request.headers['Range'] == f'bytes={offset}-'
+        assert request.headers['If-Range'] == pages.ARCHIVE_ETAG
+        context.status_code = 206
+        context.headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+            offset, len(pages.ARCHIVE_CONTENT) - 1, len(pages.ARCHIVE_CONTENT))
+        return pages.ARCHIVE_CONTENT[offset:]
+
+    site_session.mock_adapter.register_uri(
+        'GET', pages.ARCHIVE_URL, content=ranged)
+    main.download(site_session)
+    assert path.read_bytes() == pages.ARCHIVE_CONTENT
+
+
+def test_download_finishes_complete_partial_file(base_dir, site_session):
+    path = archive_path(base_dir)
+    path.parent.mkdir()
+    path.with_name(path.name + '.part').write_bytes(pages.ARCHIVE_CONTENT)
+    site_session.mock_adapter.register_uri(
+        'GET', pages.ARCHIVE_URL, status_code=416)
+    main.download(site_session)
+    assert path.read_bytes() == pages.ARCHIVE_CONTENT
+    assert not path.with_name(path.name + '.part').exists()
+
+
+def test_download_restarts_unsatisfiable_range(base_dir, site_session):
+    path = archive_path(base_dir)
+    path.parent.mkdir()
+    path.with_name(path.name + '.part').write_bytes(
+        pages.ARCHIVE_CONTENT * 2)
+
+    def unsatisfiable(request, context):
+        if 'Range' in request.headers:
+            context.status_code = 416
+            return b''
+        return pages.ARCHIVE_CONTENT
+
+    site_session.mock_adapter.register_uri(
+        'GET', pages.ARCHIVE_URL, content=unsatisfiable)
+    main.download(site_session)
+    assert path.read_bytes() == pages.ARCHIVE_CONTENT
+
+
+def test_download_several_formats(base_dir, site_session, caplog):
+    caplog.set_level('INFO')
+    main.download(site_session, Namespace(
+        formats=['pdf-a4', 'html-tar', 'epub'], segments=1))
+    tar_path = base_dir / 'downloads' / pages.TAR_ARCHIVE_URL.split('/')[-1]
+    assert archive_path(base_dir).read_bytes() == pages.ARCHIVE_CONTENT
+    assert tar_path.read_bytes() == pages.TAR_ARCHIVE_CONTENT
+    assert 'Формат epub не найден' in caplog.text
+    assert 'МБ/с' in caplog.text
+    for url in (pages.ARCHIVE_URL, pages.TAR_ARCHIVE_URL):
+        assert not site_session.cache.contains(url=url), (
+            'Параллельные загрузки не должны попадать в кеш сессии'
+        )
+
+
+def test_download_segments(base_dir, site_session, monkeypatch):
+    monkeypatch.setattr(utils, 'DOWNLOAD_SEGMENT_MIN_SIZE', 1024)
+    content = pages.ARCHIVE_CONTENT
+    headers = {
+        'Content-Length': str(len(content)),
+        'ETag': pages.ARCHIVE_ETAG,
+        'Accept-Ranges': 'bytes',
+    }
+    ranges = []
+
+    def ranged(request, context):
+        start, end = map(
+            int, request.headers['Range'].split('=')[1].split('-'))
+        ranges.append((start, end))
+        context.status_code = 206
+        context.headers['Content-Range'] = (
+            f'bytes {start}-{end}/{len(content)}')
+        return content[start:end + 1]
+
+    adapter = site_session.mock_adapter
+    adapter.register_uri('HEAD', pages.ARCHIVE_URL, headers=headers)
+    adapter.register_uri('GET', pages.ARCHIVE_URL, content=ranged)
+    main.download(site_session, Namespace(formats=['pdf-a4'], segments=4))
+    assert archive_path(base_dir).read_bytes() == content
+    assert sorted(ranges) == utils.segment_ranges(len(content), 4)
+
+
+def test_download_after_failed_segment(base_dir, site_session, monkeypatch):
+    monkeypatch.setattr(utils, 'DOWNLOAD_SEGMENT_MIN_SIZE', 1024)
+    content = pages.ARCHIVE_CONTENT
+    adapter = site_session.mock_adapter
+    adapter.register_uri('HEAD', pages.ARCHIVE_URL, headers={
+        'Content-Length': str(len(content)),
+        'ETag': pages.ARCHIVE_ETAG,
+        'Accept-Ranges': 'bytes',
+    })
+
+    def failing(request, context):
+        start, end = map(
+            int, request.headers['Range'].split('=')[1].split('-'))
+        if start:
+            context.status_code = 500
+            return b''
+        context.status_code = 206
+        context.headers['Content-Range'] = (
+            f'bytes {start}-{end}/{len(content)}')
+        return content[start:end + 1]
+
+    adapter.register_uri('GET', pages.ARCHIVE_URL, content=failing)
+    main.download(site_session, Namespace(formats=['pdf-a4'], segments=4))
+    path = archive_path(base_dir)
+    assert not path.exists()
+    assert list(path.parent.iterdir()) == [], (
+        'Недокачанные диапазоны не должны оставлять .part полного размера'
+    )
+    adapter.register_uri('GET', pages.ARCHIVE_URL, content=content)
+    main.download(site_session, Namespace(formats=['pdf-a4'], segments=1))
+    assert path.read_bytes() == content
+
+
+def test_download_rejects_broken_archive(base_dir, site_session, caplog):
+    broken = pages.ARCHIVE_CONTENT.replace(b'\x10\x11\x12', b'\x00\x00\x00')
+    site_session.mock_adapter.register_uri(
+        'GET', pages.ARCHIVE_URL, content=broken,
+        headers={'ETag': pages.ARCHIVE_ETAG})
+    main.download(site_session)
+    path = archive_path(base_dir)
+    assert not path.exists()
+    assert not path.with_name(path.name + '.part').exists()
+    assert 'повреждён' in caplog.text
+
+
+def test_segment_ranges_cover_file():
+    assert utils.segment_ranges(10, 3) == [(0, 3), (4, 7), (8, 9)]
+    assert utils.segment_ranges(10, 1) == [(0, 9)]
@@ -0,0 +1,25 @@
+import pytest
+
+from src import extractors
+from tests.fixture_data import pages
+
+
+@pytest.mark.parametrize('engine', ['bs4', 'lxml'])
+def test_extract_pep_status(engine):
+    content = pages.pep_page(8, 'Active').encode()
+    assert extractors.extract_pep_status(content, engine) == 'Active'
+
+
+def test_extract_pep_status_lxml_fallback(monkeypatch):
+    monkeypatch.setattr(extractors, 'status_from_tree', lambda content: None)
+    content = pages.pep_page(8, 'Final').encode()
+    assert extractors.extract_pep_status(content, 'lxml') == 'Final', (
+        'При несовпадении разметки lxml должен использоваться разбор bs4'
+    )
+
+
+@pytest.mark.parametrize('engine', ['bs4', 'lxml'])
+def test_extract_pep_status_missing(engine):
+    content = b'<html><section id="pep-content"></section></html>'
+    with pytest.raises(extractors.ParserFindTagException):
+        extractors.extract_pep_status(content, engine)
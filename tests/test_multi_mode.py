@@ -0,0 +1,129 @@
+import threading
+import time
+from argparse import Namespace
+
+import pytest
+
+from src import main
+from tests.fixture_data import pages
+from utils import PageCache
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+def test_page_cache_loads_each_key_once():
+    cache = PageCache()
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def load():
+        calls.append(1)
+        return 'page'
+
+    def worker():
+        barrier.wait()
+        return cache.get('url', load)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get('url', load) == 'page'
+    assert len(calls) == 1
+
+
+def test_page_cache_shares_errors():
+    cache = PageCache()
+
+    def load():
+        raise ConnectionError('boom')
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cache.get('url', load)
+
+
+def test_get_mode_args_expands_all_and_dedupes():
+    got = main.get_mode_args(Namespace(mode=['pep', 'all', 'pep']))
+    assert [args.mode for args in got] == list(main.MODE_TO_FUNCTION)
+    got = main.get_mode_args(Namespace(mode=['pep', 'whats-new', 'pep']))
+    assert [args.mode for args in got] == ['pep', 'whats-new']
+
+
+def test_connection_pool_size_covers_modes_and_downloads():
+    args = Namespace(mode=['pep', 'download'], workers=4,
+                     formats=['pdf-a4', 'html-tar'], segments=3)
+    assert main.connection_pool_size(args) == 4 * 2 + 2 * 3
+    args.mode = ['pep']
+    assert main.connection_pool_size(args) == 4
+
+
+def test_run_modes_isolates_failures(site_session, capsys, caplog,
+                                     monkeypatch):
+    keys = []
+    get = PageCache.get
+
+    def recording_get(self, key, load):
+        keys.append(key)
+        return get(self, key, load)
+
+    monkeypatch.setattr(PageCache, 'get', recording_get)
+    main.run_modes(site_session, Namespace(
+        mode=['pep', 'latest-versions', 'whats-new'], output=None, workers=2))
+    out = capsys.readouterr().out
+    assert out.index('Статус Количество') < out.index('Ссылка на статью')
+    assert f'{pages.WHATS_NEW_URL}3.8.html' in out
+    assert 'latest-versions' in caplog.text
+    assert keys and all(key[0] == 'soup' for key in keys), (
+        'Общий кеш запуска должен хранить только индексные страницы'
+    )
+    assert site_session.page_cache is None
+
+
+def test_run_modes_collects_streams_in_workers(site_session):
+    received = {}
+    main.run_modes(
+        site_session,
+        Namespace(mode=['pep', 'whats-new'], output=None, workers=2,
+                  stream=True),
+        output=lambda results, cli_args: received.update(
+            {cli_args.mode: results}))
+    assert isinstance(received['whats-new'], list), (
+        'Потоковый режим должен обходить страницы в своём потоке'
+    )
+    assert len(received['whats-new']) == len(pages.WHATS_NEW_VERSIONS) + 1
+
+
+def test_run_modes_shares_sqlite_run(site_session, base_dir, monkeypatch):
+    import sqlite3
+    import outputs
+    monkeypatch.setattr(outputs, 'BASE_DIR', base_dir)
+    args = Namespace(mode=['pep', 'whats-new'], output='sqlite', workers=2)
+    main.run_modes(site_session, args)
+    main.run_modes(site_session, args)
+    assert not hasattr(args, 'sqlite_run')
+    connection = sqlite3.connect(base_dir / 'results' / 'results.sqlite3')
+    runs = connection.execute(
+        'SELECT run_id, mode FROM runs ORDER BY run_id, mode').fetchall()
+    connection.close()
+    assert runs == [
+        (1, 'pep'), (1, 'whats-new'), (2, 'pep'), (2, 'whats-new'),
+    ], 'Режимы одного запуска должны записываться под общим run_id'
+
+
+def test_download_keeps_cache_for_other_modes(site_session):
+    def slow_archive(request, context):
+        time.sleep(0.3)
+        context.headers['Content-Length'] = str(len(pages.ARCHIVE_CONTENT))
+        return pages.ARCHIVE_CONTENT
+
+    site_session.mock_adapter.register_uri(
+        'GET', pages.ARCHIVE_URL, content=slow_archive)
+    main.run_modes(site_session, Namespace(
+        mode=['download', 'pep'], output=None, workers=2))
+    assert all(
+        site_session.cache.contains(url=pages.pep_url(number))
+        for number, *_ in pages.PEPS
+    ), 'Скачивание архива не должно отключать кеш для других режимов'
+    assert not site_session.cache.contains(url=pages.ARCHIVE_URL)
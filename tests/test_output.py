@@ -90,3 +90,66 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_keeps_rows_of_interrupted_stream(
+        monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(outputs, 'OUTPUT_BATCH_SIZE', 2)
+
+    def rows():
+        yield ('Ссылка', 'Заголовок')
+        for number in range(3):
+            yield (f'link-{number}', f'title-{number}')
+        raise ConnectionError('crawl failed')
+
+    with pytest.raises(ConnectionError):
+        outputs.control_output(rows(), cli_args('whats-new', 'file'))
+    output_file, = (Path(tmp_path) / 'results').iterdir()
+    assert output_file.read_text(encoding='utf-8').splitlines() == [
+        '"Ссылка","Заголовок"',
+        '"link-0","title-0"',
+        '"link-1","title-1"',
+        '"link-2","title-2"',
+    ], 'Строки, полученные до сбоя, должны остаться в файле'
+
+
+def test_pretty_output_accepts_generator(capsys):
+    rows = (row for row in [('Статус', 'Количество'), ('Active', 1)])
+    outputs.control_output(rows, cli_args('pep', 'pretty'))
+    captured_out, _ = capsys.readouterr()
+    assert 'Active' in captured_out
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'latest-versions', 'pep'])
+def test_control_output_sqlite(monkeypatch, tmp_path, records, mode):
+    import sqlite3
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records(mode)
+    outputs.control_output(rows, cli_args(mode, 'sqlite'))
+    outputs.control_output(rows, cli_args(mode, 'sqlite'))
+    connection = sqlite3.connect(Path(tmp_path) / 'results' / 'results.sqlite3')
+    table = mode.replace('-', '_')
+    runs = connection.execute('SELECT run_id, mode FROM runs').fetchall()
+    assert runs == [(1, mode), (2, mode)]
+    stored = connection.execute(
+        f'SELECT * FROM "{table}" WHERE run_id = 2 ORDER BY row_number'
+    ).fetchall()
+    assert [tuple(map(str, row[2:])) for row in stored] == rows[1:]
+    columns = [
+        column[1] for column in
+        connection.execute(f'PRAGMA table_info("{table}")')
+    ]
+    assert tuple(columns[2:]) == rows[0]
+    connection.close()
+
+
+def test_control_output_jsonl(monkeypatch, tmp_path, records):
+    import json
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('latest-versions')
+    outputs.control_output(rows, cli_args('latest-versions', 'jsonl'))
+    output_file, = (Path(tmp_path) / 'results').glob('*.jsonl')
+    lines = output_file.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == len(rows) - 1
+    assert json.loads(lines[0]) == dict(zip(rows[0], rows[1]))
@@ -0,0 +1,124 @@
+from argparse import Namespace
+
+import pytest
+
+from src import main
+from tests.fixture_data import pages
+
+EXPECTED = [
+    ('Статус', 'Количество'),
+    ('Active', 2),
+    ('Final', 2),
+    ('Withdrawn', 2),
+    ('Draft', 1),
+    ('Всего', 7),
+]
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+@pytest.mark.parametrize('engine', ['bs4', 'lxml'])
+def test_pep_workers(site_session, workers, engine):
+    got = main.pep(site_session, Namespace(workers=workers, engine=engine))
+    assert got == EXPECTED, (
+        'Результат `pep` не должен зависеть от количества потоков'
+    )
+
+
+def test_pep_wrong_statuses_in_order(site_session, caplog):
+    caplog.set_level('INFO')
+    main.pep(site_session, Namespace(workers=3))
+    assert 'pep-0201' in caplog.text
+    assert 'Несовпадающие статусы отсутствуют' not in caplog.text
+
+
+def test_pep_url_errors(site_session, caplog):
+    site_session.mock_adapter.register_uri(
+        'GET', 'https://peps.python.org/pep-0008/', status_code=200,
+        text='<html><section id="pep-content"></section></html>',
+    )
+    got = main.pep(site_session, Namespace(workers=2))
+    assert ('Всего', 6) in got
+    assert 'Не удалось обработать url https://peps.python.org/pep-0008/' in (
+        caplog.text
+    )
+
+
+def test_pep_incremental_fetches_only_changed(site_session, monkeypatch):
+    main.pep(site_session, Namespace(workers=2))
+    index = list(pages.PEPS)
+    index[0] = (1, 'P', 'W', 'Withdrawn')
+    index.append((3002, 'S', 'F', 'Final'))
+    adapter = site_session.mock_adapter
+    adapter.register_uri('GET', pages.MAIN_PEP_URL, text=pages.pep_index(index))
+    adapter.register_uri(
+        'GET', pages.pep_url(1), text=pages.pep_page(1, 'Withdrawn'))
+    adapter.register_uri(
+        'GET', pages.pep_url(3002), text=pages.pep_page(3002, 'Final'))
+    site_session.cache.clear()
+    fetched = []
+    fetch_pep_row = main.fetch_pep_row
+
+    def counting(session, row, **kwargs):
+        fetched.append(row[1])
+        return fetch_pep_row(session, row, **kwargs)
+
+    monkeypatch.setattr(main, 'fetch_pep_row', counting)
+    got = main.pep(site_session, Namespace(workers=2, incremental=True))
+    assert fetched == [pages.pep_url(1), pages.pep_url(3002)], (
+        'В режиме --incremental загружаются только новые и изменившиеся PEP'
+    )
+    assert got == [
+        ('Статус', 'Количество'),
+        ('Withdrawn', 3),
+        ('Active', 1),
+        ('Final', 3),
+        ('Draft', 1),
+        ('Всего', 8),
+    ]
+
+
+def test_pep_writes_snapshot(site_session, base_dir):
+    main.pep(site_session, Namespace(workers=1))
+    snapshot = main.load_snapshot(base_dir / 'snapshots' / 'pep.json')
+    entry = snapshot[pages.pep_url(8)]
+    assert entry['number'] == 8
+    assert entry['letter'] == 'A'
+    assert entry['status'] == 'Active'
+
+
+def test_pep_parse_processes(site_session):
+    got = main.pep(
+        site_session, Namespace(workers=3, engine='lxml', parse_processes=2))
+    assert got == EXPECTED, (
+        'Разбор страниц в процессах должен давать тот же результат'
+    )
+
+
+def test_pep_with_memory_ceiling(site_session):
+    got = main.pep(site_session, Namespace(workers=3, max_memory=1))
+    assert got == EXPECTED
+
+
+def test_pep_from_json_index(site_session):
+    got = main.pep(site_session, Namespace(pep_json=pages.PEP_JSON_URL))
+    assert got == EXPECTED
+    assert [request.url for request in
+            site_session.mock_adapter.request_history] == [
+        pages.MAIN_PEP_URL, pages.PEP_JSON_URL]
+
+
+def test_pep_from_local_json_with_cross_check(site_session, tmp_path,
+                                              caplog):
+    caplog.set_level('INFO')
+    number, *_ = pages.PEPS[0]
+    site_session.mock_adapter.register_uri(
+        'GET', pages.pep_url(number), text=pages.pep_page(number, 'Final'))
+    path = tmp_path / 'peps.json'
+    path.write_text(pages.pep_json(pages.PEPS[:-1]), encoding='utf-8')
+    got = main.pep(site_session, Namespace(
+        pep_json=str(path), cross_check=len(pages.PEPS), workers=2))
+    assert got[-1] == ('Всего', len(pages.PEPS) - 1)
+    assert 'проверено 6, расхождений 1' in caplog.text
+    assert 'PEP отсутствует в JSON-индексе' in caplog.text
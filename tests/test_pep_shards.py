@@ -0,0 +1,70 @@
+from argparse import Namespace
+
+import pytest
+
+from src import configs, main
+from tests.fixture_data import pages
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+def report_messages(caplog):
+    return [
+        record.getMessage() for record in caplog.records
+        if record.levelname in ('INFO', 'ERROR')
+        and 'Часть результатов' not in record.getMessage()
+    ]
+
+
+@pytest.mark.parametrize('shards', [1, 3, 10])
+def test_merged_shards_match_single_run(site_session, caplog, shards):
+    caplog.set_level('INFO')
+    number, *_ = pages.PEPS[2]
+    site_session.mock_adapter.register_uri(
+        'GET', pages.pep_url(number), exc=ConnectionError('boom'))
+    expected = main.pep(site_session, Namespace(workers=2))
+    expected_log = report_messages(caplog)
+    for shard in range(1, shards + 1):
+        main.pep(site_session, Namespace(workers=2, shard=(shard, shards)))
+    caplog.clear()
+    assert main.merge(site_session) == expected
+    assert report_messages(caplog) == expected_log
+
+
+def test_merge_requires_every_shard(site_session, base_dir):
+    main.pep(site_session, Namespace(shard=(2, 3)))
+    assert (base_dir / 'shards' / 'pep-2-of-3.json').exists()
+    with pytest.raises(ValueError, match=r'\[1, 3\]'):
+        main.merge(site_session)
+
+
+def test_merge_rejects_parts_of_different_runs(site_session):
+    for shard in range(1, 4):
+        main.pep(site_session, Namespace(shard=(shard, 3)))
+    expected = main.pep(site_session, Namespace())
+    site_session.mock_adapter.register_uri(
+        'GET', pages.MAIN_PEP_URL, text=pages.pep_index(pages.PEPS[:-1]))
+    site_session.cache.clear()
+    for shard in range(1, 3):
+        main.pep(site_session, Namespace(shard=(shard, 2)))
+    with pytest.raises(ValueError, match='--shards'):
+        main.merge(site_session)
+    assert main.merge(site_session, Namespace(shards=3)) == expected
+    assert main.merge(site_session, Namespace(shards=2)) != expected
+
+
+def test_merge_rejects_parts_of_different_indexes(site_session):
+    main.pep(site_session, Namespace(shard=(1, 2)))
+    site_session.mock_adapter.register_uri(
+        'GET', pages.MAIN_PEP_URL, text=pages.pep_index(pages.PEPS[::-1]))
+    site_session.cache.clear()
+    main.pep(site_session, Namespace(shard=(2, 2)))
+    with pytest.raises(ValueError, match='разным индексам'):
+        main.merge(site_session)
+
+
+@pytest.mark.parametrize('value', ['0/3', '4/3', '1', 'a/b'])
+def test_shard_argument_validation(value):
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--shard', value])
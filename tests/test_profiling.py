@@ -0,0 +1,45 @@
+import json
+from argparse import Namespace
+
+import profiling
+import pytest
+
+from src import main
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    monkeypatch.setattr(profiling.PROFILER, 'enabled', False)
+    profiling.PROFILER.enable()
+    yield profiling.PROFILER
+    profiling.PROFILER.enabled = False
+    profiling.PROFILER.reset()
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert profiling.percentile(values, 50) == 50
+    assert profiling.percentile(values, 99) == 99
+    assert profiling.percentile([7], 95) == 7
+
+
+def test_profile_report(profiler, site_session, base_dir):
+    main.pep(site_session, Namespace(workers=2))
+    main.pep(site_session, Namespace(workers=2))
+    path = base_dir / 'profile.json'
+    profiler.dump(path)
+    report = json.loads(path.read_text(encoding='utf-8'))
+    stages = report['stages']
+    assert stages['get_response']['count'] == 16
+    assert stages['extract.pep']['count'] == 14
+    assert set(stages['get_soup']) == {'count', 'total', 'p50', 'p95', 'p99'}
+    assert report['cache_hit_ratio'] == 0.5
+    assert report['bytes_transferred'] > 0
+    assert report['peak_rss_bytes'] > 0
+
+
+def test_profiler_disabled_by_default():
+    assert not profiling.PROFILER.enabled
+    with profiling.stage('noop'):
+        pass
+    assert 'noop' not in profiling.PROFILER.timings
@@ -0,0 +1,38 @@
+from argparse import Namespace
+
+import records
+from src import outputs
+
+
+def test_rows_are_compact_tuples():
+    row = records.VersionRow('https://docs.python.org/3.12/', '3.12', 'stable')
+    assert row == ('https://docs.python.org/3.12/', '3.12', 'stable')
+    assert not hasattr(row, '__dict__'), 'Строки не должны иметь __dict__'
+
+
+def test_statuses_are_interned():
+    first = records.StatusCountRow(''.join(['Fin', 'al']), 1)
+    second = records.StatusCountRow(''.join(['Fi', 'nal']), 2)
+    assert first.status is second.status
+
+
+def test_split_header_from_row_type():
+    rows = [records.StatusCountRow('Final', 3)]
+    header, data = records.split_header(rows)
+    assert header == ('Статус', 'Количество')
+    assert list(data) == rows
+
+
+def test_split_header_from_first_row():
+    header, data = records.split_header([('a', 'b'), (1, 2)])
+    assert header == ('a', 'b')
+    assert list(data) == [(1, 2)]
+
+
+def test_default_output_without_header_row(capsys):
+    rows = (records.StatusCountRow(status, 1) for status in ('Final', 'Draft'))
+    outputs.control_output(rows, Namespace(mode='pep', output=None))
+    captured_out, _ = capsys.readouterr()
+    assert captured_out.splitlines() == [
+        'Статус Количество', 'Final 1', 'Draft 1',
+    ]
@@ -0,0 +1,63 @@
+from argparse import Namespace
+
+import pytest
+
+from src import configs, main
+from tests.fixture_data import pages
+from replay import SnapshotReader, snapshot_session
+
+ARGS = Namespace(workers=2)
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+@pytest.fixture
+def archive(site_session, tmp_path):
+    path = tmp_path / 'site.snapshot'
+    with snapshot_session(site_session, write_path=path):
+        recorded = {
+            'whats-new': main.whats_new(site_session, ARGS),
+            'pep': main.pep(site_session, ARGS),
+        }
+        main.download(site_session, ARGS)
+    return path, recorded
+
+
+def offline_session():
+    session = configs.configure_session(backend='memory')
+    return session
+
+
+def test_replay_reproduces_results_offline(archive, tmp_path):
+    path, recorded = archive
+    session = offline_session()
+    with snapshot_session(session, read_path=path):
+        assert main.whats_new(session, ARGS) == recorded['whats-new']
+        assert main.pep(session, ARGS) == recorded['pep']
+        (tmp_path / 'downloads' / pages.ARCHIVE_URL.split('/')[-1]).unlink()
+        main.download(session, ARGS)
+    downloaded = tmp_path / 'downloads' / pages.ARCHIVE_URL.split('/')[-1]
+    assert downloaded.read_bytes() == pages.ARCHIVE_CONTENT
+    assert not hasattr(session, 'snapshot_reader')
+
+
+def test_replay_keeps_headers_and_misses_fail(archive):
+    path, _ = archive
+    reader = SnapshotReader(path)
+    try:
+        response = reader.response(pages.ARCHIVE_URL)
+        assert response.headers['ETag'] == pages.ARCHIVE_ETAG
+        assert response.content == pages.ARCHIVE_CONTENT
+        session = offline_session()
+        with snapshot_session(session, read_path=path):
+            with pytest.raises(ConnectionError, match='отсутствует в снимке'):
+                main.get_response(session, 'https://peps.python.org/x/')
+    finally:
+        reader.close()
+
+
+def test_reader_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    path.write_bytes(b'SQLite format 3\0' + bytes(64))
+    with pytest.raises(ValueError):
+        SnapshotReader(path)
@@ -0,0 +1,76 @@
+import pytest
+import scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(scheduler.time, 'sleep', fake.sleep)
+    return fake
+
+
+def test_token_bucket_limits_rate(clock):
+    bucket = scheduler.TokenBucket(rate=10, burst=5)
+    for _ in range(25):
+        bucket.acquire()
+    assert clock.now == pytest.approx(2.0), (
+        'После 5 запросов всплеска остальные 20 идут со скоростью 10 в секунду'
+    )
+
+
+def test_scheduler_slows_down_on_429(clock):
+    hosts = scheduler.HostScheduler(rate=10, burst=1)
+    url = 'https://peps.python.org/pep-0008/'
+    hosts.feedback(url, [429, 200], latency=0.1)
+    bucket = hosts.bucket('peps.python.org')
+    assert bucket.rate == 5
+    hosts.feedback(url, [200], latency=0.1)
+    assert 5 < bucket.rate <= 10
+    assert hosts.bucket('docs.python.org').rate == 10, (
+        'Ограничение одного хоста не должно влиять на другие'
+    )
+
+
+def test_scheduler_slows_down_on_rising_latency(clock):
+    hosts = scheduler.HostScheduler(rate=10, burst=1)
+    url = 'https://docs.python.org/3/'
+    hosts.feedback(url, [200], latency=0.05)
+    for _ in range(20):
+        hosts.feedback(url, [200], latency=1.0)
+    bucket = hosts.bucket('docs.python.org')
+    assert bucket.rate == pytest.approx(10 * scheduler.MIN_RATE_SHARE)
+
+
+def test_scheduler_compares_latency_of_same_kind(clock):
+    hosts = scheduler.HostScheduler(rate=10, burst=1)
+    url = 'https://docs.python.org/3/'
+    hosts.feedback(url, [200], latency=0.01, method='HEAD')
+    hosts.feedback(url, [304], latency=0.01)
+    for _ in range(20):
+        hosts.feedback(url, [200], latency=0.5)
+    assert hosts.bucket('docs.python.org').rate == 10, (
+        'Быстрые HEAD и 304 не должны замедлять обычные GET'
+    )
+
+
+def test_scheduler_ignores_latency_of_retried_requests(clock):
+    hosts = scheduler.HostScheduler(rate=10, burst=1)
+    url = 'https://docs.python.org/3/'
+    hosts.feedback(url, [200], latency=0.05)
+    for _ in range(20):
+        hosts.feedback(url, [500, 200], latency=5.0)
+        hosts.feedback(url, [None, 200], latency=5.0)
+    assert hosts.bucket('docs.python.org').rate == 10
+    assert hosts.latency[('docs.python.org', 'GET', 200)] == 0.05
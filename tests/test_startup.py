@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+from conftest import SRC_DIR
+
+HEAVY_MODULES = {
+    'bs4', 'lxml', 'prettytable', 'requests', 'requests_cache', 'tqdm',
+}
+
+
+def test_main_import_is_lazy():
+    completed = subprocess.run(
+        (sys.executable, '-c', (
+            'import sys; import main; '
+            'print(" ".join(sorted(m.split(".")[0] for m in sys.modules)))'
+        )),
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    loaded = set(completed.stdout.split())
+    assert not loaded & HEAVY_MODULES, (
+        'Импорт main.py не должен загружать тяжёлые зависимости: '
+        f'{sorted(loaded & HEAVY_MODULES)}'
+    )
+
+
+def test_help_does_not_configure_logging():
+    completed = subprocess.run(
+        (sys.executable, str(SRC_DIR / 'main.py'), '-h'),
+        capture_output=True, text=True,
+    )
+    assert completed.returncode == 0
+    assert 'Парсер запущен' not in completed.stderr, (
+        'Справка должна выводиться до настройки логирования'
+    )
@@ -0,0 +1,105 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+import transport
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    failures = 2
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.calls += 1
+        if server.calls <= self.failures:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'You are breathtaken'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def flaky_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    server.calls = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def server_url(server):
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}/'
+
+
+def test_transport_retries_unavailable(flaky_server, monkeypatch):
+    monkeypatch.setattr(transport, 'BACKOFF_FACTOR', 0)
+    session = transport.mount_transport(requests.Session(), pool_size=2)
+    response = session.get(server_url(flaky_server))
+    assert response.text == 'You are breathtaken'
+    assert flaky_server.calls == 3
+
+
+def test_transport_pool_size():
+    session = transport.mount_transport(requests.Session(), pool_size=12)
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == 12
+
+
+def test_transport_gives_up_after_retries(flaky_server, monkeypatch):
+    monkeypatch.setattr(transport, 'BACKOFF_FACTOR', 0)
+    session = transport.mount_transport(requests.Session(), retries=1)
+    with pytest.raises(requests.exceptions.RetryError):
+        session.get(server_url(flaky_server))
+
+
+def test_transport_default_timeout():
+    adapter = transport.TransportAdapter(timeout=(1, 2))
+    assert adapter.timeout == (1, 2)
+
+
+def test_jitter_retry_backoff(monkeypatch):
+    monkeypatch.setattr(transport.random, 'uniform', lambda low, high: high)
+    retry = transport.make_retry().increment(method='GET', url='/')
+    retry = retry.increment(method='GET', url='/')
+    base = transport.Retry(
+        backoff_factor=transport.BACKOFF_FACTOR, history=retry.history,
+    ).get_backoff_time()
+    assert retry.get_backoff_time() == 2 * base
+
+
+def test_transport_feeds_retried_statuses_to_scheduler(
+        flaky_server, monkeypatch):
+    monkeypatch.setattr(transport, 'BACKOFF_FACTOR', 0)
+    session = transport.mount_transport(requests.Session(), rate=100)
+    adapter = session.get_adapter('http://')
+    url = server_url(flaky_server)
+    session.get(url)
+    host = f'{flaky_server.server_address[0]}:{flaky_server.server_address[1]}'
+    assert adapter.scheduler.bucket(host).rate == 50, (
+        'Ответы 503 в повторах должны снижать частоту запросов к хосту'
+    )
+
+
+def test_transport_rate_limits_retries(flaky_server, monkeypatch):
+    monkeypatch.setattr(transport, 'BACKOFF_FACTOR', 0)
+    session = transport.mount_transport(requests.Session(), rate=100)
+    scheduler = session.get_adapter('http://').scheduler
+    acquired = []
+    monkeypatch.setattr(scheduler, 'acquire', acquired.append)
+    url = server_url(flaky_server)
+    session.get(url)
+    assert acquired == [url] * 3, (
+        'Каждый повтор должен брать токен у планировщика хоста'
+    )
@@ -54,3 +54,42 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_get_soup_parse_only(site_session):
+    from tests.fixture_data import pages
+    got = utils.get_soup(
+        site_session,
+        pages.pep_url(8),
+        parse_only=('section', {'id': 'pep-content'}),
+    )
+    assert got.find('section', {'id': 'pep-content'}) is not None
+    assert got.find('body') is None, (
+        'При parse_only дерево должно содержать только целевой тег'
+    )
+
+
+@pytest.mark.parametrize('over_limit, max_in_flight', [(False, 4), (True, 1)])
+def test_imap_bounded_memory_backpressure(monkeypatch, over_limit,
+                                          max_in_flight):
+    import threading
+    import time
+    monkeypatch.setattr(
+        utils, 'memory_exceeded', lambda limit: over_limit)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def work(item):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return item
+
+    got = list(utils.imap_bounded(work, range(12), workers=2, max_memory=1))
+    assert got == list(range(12))
+    assert in_flight[1] <= max_in_flight
+    if over_limit:
+        assert in_flight[1] == 1
@@ -0,0 +1,101 @@
+import threading
+from argparse import Namespace
+
+import pytest
+
+from src import main
+from tests.fixture_data import pages
+
+HEADER_LINE = 'Статус Количество'
+
+
+class CountdownEvent(threading.Event):
+    """Событие, которое выставляется после заданного числа ожиданий."""
+
+    def __init__(self, cycles, on_wait=None):
+        super().__init__()
+        self.cycles = cycles
+        self.on_wait = on_wait or (lambda cycle: None)
+
+    def wait(self, timeout=None):
+        self.cycles -= 1
+        self.on_wait(self.cycles)
+        if self.cycles <= 0:
+            self.set()
+        return self.is_set()
+
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+def watch_args(**kwargs):
+    return Namespace(mode=['pep'], output=None, workers=2, watch=60, **kwargs)
+
+
+def test_watch_skips_unchanged_results(site_session, capsys, caplog):
+    caplog.set_level('INFO')
+    main.watch(site_session, watch_args(), CountdownEvent(3))
+    assert capsys.readouterr().out.count(HEADER_LINE) == 1
+    assert caplog.text.count('Результаты режима pep не изменились') == 2
+    assert site_session.settings.always_revalidate
+
+
+def register_pep(site_session, number, status, etag):
+    site_session.mock_adapter.register_uri(
+        'GET', pages.pep_url(number),
+        text=pages.pep_page(number, status), headers={'ETag': etag})
+
+
+def test_watch_outputs_changed_results(site_session, capsys):
+    for number, _, _, status in pages.PEPS:
+        register_pep(site_session, number, status, '"v1"')
+    number, *_ = pages.PEPS[0]
+
+    def change_status(cycle):
+        register_pep(site_session, number, 'Rejected', '"v2"')
+
+    main.watch(site_session, watch_args(), CountdownEvent(2, change_status))
+    out = capsys.readouterr().out
+    assert out.count(HEADER_LINE) == 2
+    assert 'Rejected' in out
+
+
+def test_watch_logs_report_only_when_changed(site_session, caplog):
+    caplog.set_level('INFO')
+    main.watch(site_session, watch_args(), CountdownEvent(3))
+    assert caplog.text.count('Несовпадающие статусы') == 1
+
+
+def test_watch_outputs_changed_mismatches(site_session, capsys, caplog):
+    caplog.set_level('INFO')
+    for number, _, _, status in pages.PEPS:
+        register_pep(site_session, number, status, '"v1"')
+    adapter = site_session.mock_adapter
+    adapter.register_uri('GET', pages.MAIN_PEP_URL, text=pages.pep_index(),
+                         headers={'ETag': '"i1"'})
+    # Буква в индексе меняется, статус на странице - нет: таблица та же.
+    changed = [(8, 'P', 'F', 'Active') if pep[0] == 8 else pep
+               for pep in pages.PEPS]
+
+    def change_letter(cycle):
+        adapter.register_uri(
+            'GET', pages.MAIN_PEP_URL, text=pages.pep_index(changed),
+            headers={'ETag': '"i2"'})
+
+    main.watch(site_session, watch_args(), CountdownEvent(2, change_letter))
+    assert capsys.readouterr().out.count(HEADER_LINE) == 2
+    assert 'Результаты режима pep не изменились' not in caplog.text
+    assert 'pep-0008' in caplog.text
+
+
+def test_stop_signal_sets_event():
+    import signal
+    stop = threading.Event()
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        main.handle_stop_signals(stop)
+        signal.raise_signal(signal.SIGTERM)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    assert stop.is_set()
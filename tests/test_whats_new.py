@@ -0,0 +1,36 @@
+from argparse import Namespace
+
+import pytest
+
+from src import main
+from tests.fixture_data import pages
+
+pytestmark = pytest.mark.usefixtures('base_dir')
+
+
+@pytest.mark.parametrize('workers, parse_processes', [(1, 0), (3, 0), (3, 2)])
+def test_whats_new_rows_in_table_order(site_session, workers, parse_processes):
+    got = main.whats_new(site_session, Namespace(
+        workers=workers, parse_processes=parse_processes))
+    assert got[0] == ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+    assert [row[0] for row in got[1:]] == [
+        f'{pages.WHATS_NEW_URL}{version}.html'
+        for version in pages.WHATS_NEW_VERSIONS
+    ]
+    assert got[1][1] == 'What’s New In Python 3.12'
+    assert got[1][2] == 'Editor Editor 3.12'
+
+
+def test_whats_new_url_errors(site_session, caplog):
+    site_session.mock_adapter.register_uri(
+        'GET', f'{pages.WHATS_NEW_URL}3.10.html', exc=ConnectionError('boom'))
+    got = main.whats_new(site_session, Namespace(workers=2))
+    assert len(got) == len(pages.WHATS_NEW_VERSIONS)
+    assert f'{pages.WHATS_NEW_URL}3.10.html' in caplog.text
+
+
+def test_whats_new_stream_returns_generator(site_session):
+    got = main.whats_new(site_session, Namespace(workers=2, stream=True))
+    assert not isinstance(got, list)
+    assert next(got) == ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+    assert len(list(got)) == len(pages.WHATS_NEW_VERSIONS)